@@ -1,12 +1,53 @@
-from flask import Flask, render_template, request, jsonify, make_response
+from flask import Flask, render_template, request, jsonify, make_response, send_file, g
 from flask_cors import CORS
+import importlib
+import itertools
 import os
+import threading
+import uuid
 from datetime import datetime
+from werkzeug.utils import secure_filename
 
 from config import config
+from commands import register_commands
 from database.models import db, Contact, ContactMethod
+from database.tenants import TenantRegistry, TenantPathMiddleware, is_valid_tenant_id
 from services.contact_service import ContactService
-from utils.excel_generator import ExcelGenerator
+
+# 支持的导出格式：格式 -> (模块, 类, 写入方法, 文件扩展名, Content-Type)
+# 导入导出相关模块只在第一次使用时加载，加快worker启动
+EXPORT_FORMATS = {
+    'csv': ('utils.excel_generator', 'ExcelGenerator', 'write_contacts_csv', 'csv',
+            'text/csv'),
+    'xlsx': ('utils.excel_generator', 'ExcelGenerator', 'write_contacts_xlsx', 'xlsx',
+             'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'vcf': ('utils.vcard_generator', 'VCardGenerator', 'write_contacts', 'vcf',
+            'text/vcard'),
+    'vcf4': ('utils.vcard_generator', 'VCardGenerator', 'write_contacts_v4', 'vcf',
+             'text/vcard'),
+    'ndjson': ('utils.ndjson_generator', 'JsonLinesGenerator', 'write_contacts', 'ndjson',
+               'application/x-ndjson; charset=utf-8'),
+}
+
+# 支持的导入格式：格式 -> (模块, 类, 解析方法)，解析方法逐个产出联系人数据
+IMPORT_FORMATS = {
+    'excel': ('utils.excel_generator', 'ExcelGenerator', 'parse_excel_file'),
+    'vcf': ('utils.vcard_generator', 'VCardGenerator', 'parse_file'),
+    'ndjson': ('utils.ndjson_generator', 'JsonLinesGenerator', 'parse_file'),
+}
+
+# 未指定format时按文件扩展名选择导入格式
+IMPORT_EXTENSIONS = {
+    'xlsx': 'excel', 'csv': 'excel',
+    'vcf': 'vcf', 'vcard': 'vcf',
+    'ndjson': 'ndjson', 'jsonl': 'ndjson',
+}
+
+
+def load_handler(module_name, class_name, method_name):
+    """按需导入模块，返回类上的方法"""
+    module = importlib.import_module(module_name)
+    return getattr(getattr(module, class_name), method_name)
 
 
 def create_app(config_name='default'):
@@ -18,8 +59,66 @@ def create_app(config_name='default'):
     db.init_app(app)
     CORS(app)
 
+    # 多租户：租户数据库在首次访问时才打开
+    app.extensions['tenants'] = TenantRegistry(app.config['TENANT_FOLDER'],
+                                               db.metadata,
+                                               max_engines=app.config['TENANT_ENGINE_POOL_SIZE'])
+    app.wsgi_app = TenantPathMiddleware(app.wsgi_app, header=app.config['TENANT_HEADER'])
+    register_commands(app)
+
     # 初始化服务
-    contact_service = ContactService(db)
+    contact_service = ContactService(db,
+                                     cache_size=app.config['CONTACT_CACHE_SIZE'],
+                                     list_cache_size=app.config['LIST_CACHE_SIZE'],
+                                     max_tenants=app.config['TENANT_ENGINE_POOL_SIZE'])
+    if app.config['WRITE_BEHIND_ENABLED']:
+        contact_service.enable_write_behind(app,
+                                            interval=app.config['WRITE_BEHIND_INTERVAL'],
+                                            batch_size=app.config['WRITE_BEHIND_BATCH_SIZE'])
+
+    def get_export_cache():
+        """导出快照缓存（首次导出时才创建）"""
+        if 'export_cache' not in app.extensions:
+            from utils.export_cache import ExportCache
+            app.extensions['export_cache'] = ExportCache(app.config['EXPORT_CACHE_FOLDER'],
+                                                         max_bytes=app.config['EXPORT_CACHE_MAX_BYTES'],
+                                                         max_age=app.config['EXPORT_CACHE_MAX_AGE'])
+        return app.extensions['export_cache']
+
+    def get_upload_service():
+        """分块上传服务（首次上传时才创建）"""
+        if 'upload_service' not in app.extensions:
+            from services.upload_service import UploadService
+            app.extensions['upload_service'] = UploadService(app.config['UPLOAD_FOLDER'],
+                                                             chunk_size=app.config['UPLOAD_CHUNK_SIZE'],
+                                                             session_ttl=app.config['UPLOAD_SESSION_TTL'],
+                                                             max_size=app.config['UPLOAD_MAX_SIZE'])
+        return app.extensions['upload_service']
+
+    # 开发环境在第一个请求时建表并为旧数据建立反查索引（与 flask init-db 相同）；
+    # 生产环境请使用 flask init-db
+    schema_state = {'ready': not app.config['AUTO_CREATE_SCHEMA']}
+    schema_lock = threading.Lock()
+
+    @app.before_request
+    def ensure_schema():
+        if not schema_state['ready']:
+            with schema_lock:
+                if not schema_state['ready']:
+                    db.create_all()
+                    count = contact_service.backfill_lookup_index()
+                    if count:
+                        print(f"已为旧数据建立 {count} 条反查索引")
+                    schema_state['ready'] = True
+
+    @app.before_request
+    def select_tenant():
+        """根据请求头（或 /t/<tenant_id>/ 路径前缀）选择租户"""
+        tenant_id = request.headers.get(app.config['TENANT_HEADER'])
+        if tenant_id:
+            if not is_valid_tenant_id(tenant_id):
+                return jsonify({'success': False, 'error': '无效的租户ID'}), 400
+            g.tenant_id = tenant_id
 
     @app.route('/')
     def index():
@@ -34,10 +133,10 @@ def create_app(config_name='default'):
     @app.route('/api/template/download')
     def download_csv_template():
         """下载CSV模板"""
-        template = """姓名,电话,邮箱,社交媒体,地址,备注,是否收藏
-张三,13800138000; 13900139000,zhangsan@example.com,@zhangsan,北京市海淀区,同事,是
-李四,13600136000,lisi@example.com,,上海市浦东新区,朋友,否
-王五,13700137000,wangwu@example.com,@wangwu,广州市天河区,同学,是"""
+        template = """姓名,电话,邮箱,社交媒体,地址,备注,是否收藏,标签
+张三,13800138000; 13900139000,zhangsan@example.com,@zhangsan,北京市海淀区,同事,是,同事; 北京
+李四,13600136000,lisi@example.com,,上海市浦东新区,朋友,否,朋友
+王五,13700137000,wangwu@example.com,@wangwu,广州市天河区,同学,是,同学"""
 
         response = make_response(template)
         response.headers['Content-Disposition'] = 'attachment; filename=通讯录模板.csv'
@@ -125,64 +224,210 @@ def create_app(config_name='default'):
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @app.route('/api/lookup', methods=['GET'])
+    def lookup_contacts():
+        """根据电话或邮箱反查联系人"""
+        try:
+            phone = request.args.get('phone', '')
+            email = request.args.get('email', '')
+            if phone:
+                contacts = contact_service.lookup_by_phone(phone)
+            elif email:
+                contacts = contact_service.lookup_by_email(email)
+            else:
+                return jsonify({'success': False, 'error': '请提供phone或email参数'}), 400
+
+            return jsonify({'success': True, 'data': contacts})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/lookup/batch', methods=['POST'])
+    def batch_lookup_contacts():
+        """批量反查联系人"""
+        try:
+            data = request.json or {}
+            phones = data.get('phones', [])
+            emails = data.get('emails', [])
+            if not isinstance(phones, list) or not isinstance(emails, list):
+                return jsonify({'success': False, 'error': 'phones和emails必须是列表'}), 400
+            if not all(isinstance(item, str) for item in phones + emails):
+                return jsonify({'success': False, 'error': 'phones和emails中的每一项必须是字符串'}), 400
+
+            if len(phones) + len(emails) > app.config['LOOKUP_BATCH_MAX']:
+                return jsonify({
+                    'success': False,
+                    'error': f"单次最多反查{app.config['LOOKUP_BATCH_MAX']}条"
+                }), 400
+
+            result = contact_service.batch_lookup(phones, emails)
+            return jsonify({'success': True, 'data': result})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    # ========== 分组/标签 ==========
+
+    def split_names(value):
+        """把逗号分隔的分组名参数转换成列表"""
+        return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+    def get_page_args():
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+        return page, per_page
+
+    @app.route('/api/groups', methods=['GET'])
+    def get_groups():
+        """获取所有分组及联系人数量"""
+        try:
+            return jsonify({'success': True, 'data': contact_service.get_groups()})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/groups', methods=['POST'])
+    def create_group():
+        """创建分组"""
+        try:
+            data = request.json or {}
+            group = contact_service.create_group(data.get('name'))
+            return jsonify({'success': True, 'data': group}), 201
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/groups/<int:group_id>', methods=['DELETE'])
+    def delete_group(group_id):
+        """删除分组"""
+        try:
+            if contact_service.delete_group(group_id):
+                return jsonify({'success': True, 'message': '删除成功'})
+            return jsonify({'success': False, 'error': '分组不存在'}), 404
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/groups/<name>/contacts', methods=['GET'])
+    def get_group_contacts(name):
+        """分页获取分组中的联系人"""
+        try:
+            page, per_page = get_page_args()
+            result = contact_service.query_group_contacts(all_of=[name], page=page, per_page=per_page)
+            return jsonify({'success': True, 'data': result})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/groups/query', methods=['GET'])
+    def query_groups():
+        """
+        按分组集合查询联系人
+        例如 ?all=同事,北京&none=离职 表示同时属于"同事"和"北京"、但不属于"离职"的联系人；
+        any=A,B 表示属于A或B；count_only=1 时只返回数量
+        """
+        try:
+            all_of = split_names(request.args.get('all'))
+            any_of = split_names(request.args.get('any'))
+            none_of = split_names(request.args.get('none'))
+            if not (all_of or any_of or none_of):
+                return jsonify({'success': False, 'error': '请提供all、any或none参数'}), 400
+
+            if request.args.get('count_only') in ('1', 'true'):
+                count = contact_service.count_group_contacts(all_of, any_of, none_of)
+                return jsonify({'success': True, 'data': {'total': count}})
+
+            page, per_page = get_page_args()
+            result = contact_service.query_group_contacts(all_of, any_of, none_of,
+                                                          page=page, per_page=per_page)
+            return jsonify({'success': True, 'data': result})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/contacts/<int:contact_id>/tags', methods=['PUT'])
+    def set_contact_tags(contact_id):
+        """设置联系人的分组/标签"""
+        try:
+            tags = (request.json or {}).get('tags', [])
+            if not isinstance(tags, list):
+                return jsonify({'success': False, 'error': 'tags必须是列表'}), 400
+
+            contact = contact_service.set_contact_tags(contact_id, tags)
+            if contact:
+                return jsonify({'success': True, 'data': contact})
+            return jsonify({'success': False, 'error': '联系人不存在'}), 404
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
     # ========== 导入导出功能 ==========
 
     @app.route('/api/contacts/export', methods=['GET'])
     def export_contacts():
-        """导出联系人到Excel - 修复性能问题"""
+        """导出联系人（CSV/Excel/vCard/JSON Lines） - 数据未变化时复用导出快照"""
         try:
             import time
             start_time = time.time()
 
+            export_format = request.args.get('format', 'csv').lower()
+            if export_format not in EXPORT_FORMATS:
+                return jsonify({'success': False, 'error': f'不支持的导出格式: {export_format}'}), 400
+
+            module_name, class_name, writer_name, ext, mimetype = EXPORT_FORMATS[export_format]
+            writer = load_handler(module_name, class_name, writer_name)
+            export_cache = get_export_cache()
+
             print(f"\n{'=' * 50}")
             print(f"📤 开始导出 - {datetime.now().strftime('%H:%M:%S')}")
 
-            # 1. 获取联系人
-            contacts = contact_service.get_all_contacts()
-            print(f"📊 联系人数量: {len(contacts)}")
-
-            if not contacts:
-                print("⚠️ 没有联系人数据，创建测试数据...")
-                # 创建一些测试数据
-                contacts = [
-                    {
-                        'id': 1,
-                        'name': '测试用户',
-                        'notes': '测试备注',
-                        'is_favorite': True,
-                        'contact_methods': [
-                            {'type': 'phone', 'value': '13800000000', 'label': '手机'}
-                        ],
-                        'created_at': '2024-01-01 00:00:00',
-                        'updated_at': '2024-01-01 00:00:00'
-                    }
-                ]
-
-            print(f"⏱️ 获取联系人耗时: {time.time() - start_time:.2f}秒")
-
-            # 2. 生成Excel内容
-            excel_start = time.time()
-
-            # 简化Excel生成 - 对于大量数据可能需要优化
-            print("🔄 正在生成Excel文件...")
-
-            # 使用简化的Excel生成
-            excel_content = generate_simple_excel(contacts)
-
-            print(f"⏱️ 生成Excel耗时: {time.time() - excel_start:.2f}秒")
-            print(f"📄 文件大小: {len(excel_content)} 字节")
-
-            # 3. 创建响应
-            filename = f"通讯录_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-
-            response = make_response(excel_content)
-            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-            # 如果是CSV内容，用CSV的Content-Type
-            if filename.endswith('.csv'):
-                response.headers['Content-Type'] = 'text/csv; charset=utf-8'
-            else:
-                response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            # 1. 根据数据版本号定位快照，未变化时无需重新生成
+            contact_service.flush_pending()
+            version = contact_service.get_data_version()
+            # 租户的键带"t."前缀（租户ID中不允许出现"."），任何租户都不会和默认数据库共用快照
+            tenant_id = g.get('tenant_id')
+            tenant_key = f't.{tenant_id}' if tenant_id else 'default'
+            snapshot_path = export_cache.snapshot_path('contacts', tenant_key, f'v{version}',
+                                                       export_format, ext=ext)
+
+            def build_snapshot(fileobj):
+                # 分批读取联系人并逐个写入，不把全部联系人读入内存
+                contacts = contact_service.iter_contacts()
+                first = next(contacts, None)
+
+                if first is None:
+                    print("⚠️ 没有联系人数据，创建测试数据...")
+                    # 创建一些测试数据
+                    contacts = [
+                        {
+                            'id': 1,
+                            'name': '测试用户',
+                            'notes': '测试备注',
+                            'is_favorite': True,
+                            'tags': [],
+                            'contact_methods': [
+                                {'type': 'phone', 'value': '13800000000', 'label': '手机'}
+                            ],
+                            'created_at': '2024-01-01 00:00:00',
+                            'updated_at': '2024-01-01 00:00:00'
+                        }
+                    ]
+                else:
+                    contacts = itertools.chain([first], contacts)
+
+                print("🔄 正在生成导出文件...")
+                writer(contacts, fileobj)
+
+            cached = os.path.exists(snapshot_path)
+            path = export_cache.get_or_create(snapshot_path, build_snapshot)
+            print(f"{'♻️ 复用导出快照' if cached else '⏱️ 生成导出快照'}: {os.path.basename(path)}")
+            print(f"📄 文件大小: {os.path.getsize(path)} 字节")
+
+            # 2. 通过send_file发送，支持Range断点续传和条件请求
+            filename = f"通讯录_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext}"
+            response = send_file(
+                path,
+                mimetype=mimetype,
+                as_attachment=True,
+                download_name=filename,
+                conditional=True,
+                etag=f'contacts-{tenant_key}-v{version}-{export_format}',
+                max_age=0
+            )
 
             total_time = time.time() - start_time
             print(f"✅ 导出完成 - 总耗时: {total_time:.2f}秒")
@@ -197,106 +442,178 @@ def create_app(config_name='default'):
             traceback.print_exc()
             return jsonify({'success': False, 'error': str(e)}), 500
 
-    def generate_simple_excel(contacts):
-        """生成简化的Excel/CSV文件"""
-        import csv
-        import io
-
-        # 创建CSV内容
-        output = io.StringIO()
-
-        # 表头
-        fieldnames = ['姓名', '电话', '邮箱', '社交媒体', '地址', '备注', '是否收藏']
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
-
-        # 写入数据
-        for contact in contacts:
-            # 提取各种联系方式
-            phones = []
-            emails = []
-            socials = []
-            addresses = []
-
-            for method in contact.get('contact_methods', []):
-                if method['type'] == 'phone':
-                    phones.append(method['value'])
-                elif method['type'] == 'email':
-                    emails.append(method['value'])
-                elif method['type'] == 'social':
-                    socials.append(method['value'])
-                elif method['type'] == 'address':
-                    addresses.append(method['value'])
-
-            row = {
-                '姓名': contact.get('name', ''),
-                '电话': '; '.join(phones),
-                '邮箱': '; '.join(emails),
-                '社交媒体': '; '.join(socials),
-                '地址': '; '.join(addresses),
-                '备注': contact.get('notes', ''),
-                '是否收藏': '是' if contact.get('is_favorite', False) else '否'
-            }
-
-            writer.writerow(row)
-
-        content = output.getvalue()
-        return content.encode('utf-8-sig')
+    def import_contacts_file(path, import_format=None):
+        """
+        从磁盘上的文件导入联系人：流式解析 -> 分块校验 -> 写入数据库
 
-    @app.route('/api/contacts/import', methods=['POST'])
-    def import_contacts():
-        """从Excel导入联系人"""
-        try:
-            if 'file' not in request.files:
-                return jsonify({'success': False, 'error': '没有上传文件'}), 400
+        参数：
+            path: str, 文件路径
+            import_format: str, 导入格式（见 IMPORT_FORMATS），默认按扩展名判断
 
-            file = request.files['file']
-            if file.filename == '':
-                return jsonify({'success': False, 'error': '没有选择文件'}), 400
+        返回：
+            tuple: (成功数量, 错误记录列表)
+        """
+        from utils.import_validator import iter_validated_chunks
 
-            # 检查文件格式
-            if not file.filename.endswith(('.xlsx', '.xls', '.csv')):
-                return jsonify({'success': False, 'error': '只支持Excel/CSV文件'}), 400
+        import_format = import_format or get_import_format(path)
+        parser = load_handler(*IMPORT_FORMATS[import_format])
 
-            # 读取文件内容
-            file_content = file.read()
-            print(f"=== 导入调试 ===")
-            print(f"文件大小: {len(file_content)} bytes")
+        print(f"=== 导入调试 ===")
+        print(f"文件大小: {os.path.getsize(path)} bytes, 格式: {import_format}")
 
-            # 使用纯Python解析
-            contacts_data = ExcelGenerator.parse_excel_to_contacts(file_content)
+        # 使用纯Python流式解析
+        contacts_data = parser(path)
 
-            print(f"解析出的联系人数量: {len(contacts_data)}")
+        success_count = 0
+        error_records = []
 
-            # 导入数据
-            success_count = 0
-            error_records = []
+        # 校验并规范化，只有合格的数据才写入数据库
+        for clean_contacts, chunk_errors in iter_validated_chunks(
+                contacts_data,
+                workers=app.config['IMPORT_VALIDATION_WORKERS'],
+                chunk_size=app.config['IMPORT_VALIDATION_CHUNK_SIZE']):
+            error_records.extend(chunk_errors)
 
-            for index, contact_data in enumerate(contacts_data):
+            for contact_data in clean_contacts:
                 try:
                     contact_service.create_contact(contact_data)
                     success_count += 1
                     print(f"成功导入: {contact_data['name']}")
                 except Exception as e:
+                    db.session.rollback()
                     error_records.append({
-                        '行号': index + 2,
+                        '行号': contact_data.get('line_number'),
                         '姓名': contact_data.get('name', ''),
                         '错误': str(e)
                     })
                     print(f"导入失败: {contact_data.get('name', '')} - {e}")
 
-            print(f"导入结果: 成功 {success_count}, 失败 {len(error_records)}")
-            print("=== 导入结束 ===")
+        print(f"导入结果: 成功 {success_count}, 失败 {len(error_records)}")
+        print("=== 导入结束 ===")
+        return success_count, error_records
+
+    def import_result(success_count, error_records):
+        return jsonify({
+            'success': True,
+            'message': f'导入完成，成功{success_count}条，失败{len(error_records)}条',
+            'errors': error_records
+        })
+
+    def is_allowed_import_file(filename):
+        return '.' in filename and \
+            filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
+
+    def get_import_format(filename):
+        """导入格式：优先使用请求中的format参数，否则按文件扩展名判断"""
+        import_format = request.args.get('format')
+        if import_format:
+            import_format = import_format.lower()
+            if import_format in ('csv', 'xlsx'):
+                import_format = 'excel'
+            if import_format not in IMPORT_FORMATS:
+                raise ValueError(f'不支持的导入格式: {import_format}')
+            return import_format
+        return IMPORT_EXTENSIONS.get(filename.rsplit('.', 1)[-1].lower(), 'excel')
 
-            return jsonify({
-                'success': True,
-                'message': f'导入完成，成功{success_count}条，失败{len(error_records)}条',
-                'errors': error_records
-            })
+    @app.route('/api/contacts/import', methods=['POST'])
+    def import_contacts():
+        """导入联系人（CSV/Excel/vCard/JSON Lines），可通过format参数指定格式"""
+        path = None
+        try:
+            if 'file' not in request.files:
+                return jsonify({'success': False, 'error': '没有上传文件'}), 400
+
+            file = request.files['file']
+            if file.filename == '':
+                return jsonify({'success': False, 'error': '没有选择文件'}), 400
+
+            # 检查文件格式
+            if not is_allowed_import_file(file.filename):
+                return jsonify({'success': False, 'error': '只支持Excel/CSV/vCard/JSON Lines文件'}), 400
+
+            import_format = get_import_format(file.filename)
+
+            # 保存到上传目录后从磁盘解析，不把整个文件读入内存
+            path = os.path.join(app.config['UPLOAD_FOLDER'],
+                                f"{uuid.uuid4().hex}_{secure_filename(file.filename) or 'upload'}")
+            file.save(path)
 
+            return import_result(*import_contacts_file(path, import_format))
+
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         except Exception as e:
             print(f"导入异常: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
+        finally:
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    # ========== 分块上传 ==========
+
+    @app.route('/api/uploads', methods=['POST'])
+    def create_upload():
+        """创建分块上传会话"""
+        try:
+            data = request.json or {}
+            filename = data.get('filename', '')
+            if not is_allowed_import_file(filename):
+                return jsonify({'success': False, 'error': '只支持Excel/CSV/vCard/JSON Lines文件'}), 400
+
+            session = get_upload_service().create_session(filename, data.get('size'), data.get('checksum'))
+            return jsonify({'success': True, 'data': session}), 201
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/uploads/<upload_id>', methods=['GET'])
+    def get_upload(upload_id):
+        """查询上传进度（用于断点续传）"""
+        session = get_upload_service().get_session(upload_id)
+        if session:
+            return jsonify({'success': True, 'data': session})
+        return jsonify({'success': False, 'error': '上传会话不存在'}), 404
+
+    @app.route('/api/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+    def upload_chunk(upload_id, index):
+        """上传一个分块，请求体为分块的原始字节"""
+        try:
+            session = get_upload_service().write_chunk(upload_id, index, request.stream,
+                                                 request.headers.get('X-Chunk-Checksum'))
+            if session:
+                return jsonify({'success': True, 'data': session})
+            return jsonify({'success': False, 'error': '上传会话不存在'}), 404
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+    def complete_upload(upload_id):
+        """合并分块并导入联系人"""
+        path = None
+        try:
+            path = get_upload_service().finalize(upload_id)
+            if not path:
+                return jsonify({'success': False, 'error': '上传会话不存在'}), 404
+
+            return import_result(*import_contacts_file(path))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            print(f"导入异常: {e}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+        finally:
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    @app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+    def abort_upload(upload_id):
+        """取消上传"""
+        if get_upload_service().abort(upload_id):
+            return jsonify({'success': True, 'message': '已取消上传'})
+        return jsonify({'success': False, 'error': '上传会话不存在'}), 404
 
     @app.route('/api/favorites', methods=['GET'])
     def get_favorites():
@@ -313,6 +630,7 @@ def create_app(config_name='default'):
     def get_stats():
         """获取统计数据"""
         try:
+            contact_service.flush_pending()
             all_contacts = Contact.query.all()
             favorite_contacts = Contact.query.filter_by(is_favorite=True).all()
 
@@ -336,6 +654,11 @@ def create_app(config_name='default'):
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @app.route('/api/cache/stats', methods=['GET'])
+    def get_cache_stats():
+        """获取缓存命中统计"""
+        return jsonify({'success': True, 'data': contact_service.get_cache_stats()})
+
     # ========== 错误处理 ==========
 
     @app.errorhandler(404)
@@ -348,62 +671,21 @@ def create_app(config_name='default'):
 
     @app.errorhandler(413)
     def request_entity_too_large(error):
-        return jsonify({'success': False, 'error': '文件太大，最大支持16MB'}), 413
+        return jsonify({'success': False, 'error': '文件太大，最大支持16MB，更大的文件请使用分块上传'}), 413
 
     return app
 
 
 if __name__ == '__main__':
+    # 开发服务器；生产环境请使用 wsgi.py（如 gunicorn wsgi:app），
+    # 并先执行 flask --app wsgi init-db 建表
     app = create_app('development')
 
-    with app.app_context():
-        # 创建数据库表
-        db.create_all()
-
-        # 添加测试数据（如果数据库为空）
-        if Contact.query.count() == 0:
-            print("添加测试数据...")
-            test_contacts = [
-                {
-                    'name': '张三',
-                    'notes': '同事',
-                    'is_favorite': True,
-                    'contact_methods': [
-                        {'type': 'phone', 'value': '13800138000', 'label': '工作电话'},
-                        {'type': 'email', 'value': 'zhangsan@example.com', 'label': '工作邮箱'}
-                    ]
-                },
-                {
-                    'name': '李四',
-                    'notes': '朋友',
-                    'is_favorite': False,
-                    'contact_methods': [
-                        {'type': 'phone', 'value': '13900139000', 'label': '手机'},
-                        {'type': 'address', 'value': '北京市海淀区', 'label': '家庭地址'}
-                    ]
-                },
-                {
-                    'name': '王五',
-                    'notes': '同学',
-                    'is_favorite': True,
-                    'contact_methods': [
-                        {'type': 'phone', 'value': '13700137000', 'label': '手机'},
-                        {'type': 'social', 'value': '@wangwu', 'label': '微信'},
-                        {'type': 'email', 'value': 'wangwu@example.com', 'label': '个人邮箱'}
-                    ]
-                }
-            ]
-
-            contact_service = ContactService(db)
-            for contact_data in test_contacts:
-                contact_service.create_contact(contact_data)
-
-            print("测试数据添加完成！")
-
-        print("✅ 数据库表创建完成！")
-        print("✅ 服务器启动中...")
-        print("🌐 请访问: http://127.0.0.1:5000")
-        print("📄 模板页面: http://127.0.0.1:5000/template")
-        print("📊 API测试: http://127.0.0.1:5000/api/contacts")
+    print("✅ 服务器启动中...")
+    print("💡 首次运行可执行 flask --app app seed-db 添加测试数据")
+    print("💡 升级旧数据库后请执行 flask --app app init-db 建立反查索引（开发服务器会在第一个请求时自动执行）")
+    print("🌐 请访问: http://127.0.0.1:5000")
+    print("📄 模板页面: http://127.0.0.1:5000/template")
+    print("📊 API测试: http://127.0.0.1:5000/api/contacts")
 
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    app.run(debug=True, port=5000)
@@ -0,0 +1,131 @@
+"""
+冷启动基准测试：测量从启动进程到第一个请求成功返回的时间
+
+    python benchmarks/cold_start.py                 # 启动真实HTTP服务并轮询
+    python benchmarks/cold_start.py --mode client   # 子进程内用test_client发请求
+    python benchmarks/cold_start.py --runs 20 --output cold_start.json
+
+结果以JSON输出（单位：毫秒）
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CLIENT_SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+from wsgi import app
+response = app.test_client().get('/api/contacts')
+sys.stdout.write(str(response.status_code) + '\\n')
+sys.stdout.flush()
+"""
+
+SERVER_SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+from werkzeug.serving import make_server
+from wsgi import app
+make_server('127.0.0.1', {port}, app, threaded=True).serve_forever()
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_client_once(env):
+    """子进程内启动应用并用test_client请求一次"""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', CLIENT_SCRIPT.format(root=ROOT)],
+                            env=env, stdout=subprocess.PIPE, text=True)
+    status = proc.stdout.readline().strip()
+    elapsed = time.perf_counter() - start
+    proc.wait()
+    if status != '200':
+        raise RuntimeError(f'请求失败: {status}')
+    return elapsed
+
+
+def run_server_once(env, timeout=30):
+    """启动HTTP服务，轮询直到第一个请求成功"""
+    port = free_port()
+    url = f'http://127.0.0.1:{port}/api/contacts'
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', SERVER_SCRIPT.format(root=ROOT, port=port)],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError('服务进程意外退出')
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise RuntimeError('等待服务启动超时')
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='冷启动基准测试')
+    parser.add_argument('--mode', choices=['server', 'client'], default='server')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--config', default='production', help='FLASK_CONFIG配置名')
+    parser.add_argument('--output', help='结果写入的JSON文件')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ,
+                   DATABASE_URL='sqlite:///' + os.path.join(tmp, 'bench.db'),
+                   FLASK_CONFIG=args.config)
+
+        # 部署步骤：建表不计入启动时间
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'wsgi', 'init-db'],
+                       cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+
+        run_once = run_server_once if args.mode == 'server' else run_client_once
+        samples = [run_once(env) * 1000 for _ in range(args.runs)]
+
+    result = {
+        'mode': args.mode,
+        'config': args.config,
+        'runs': args.runs,
+        'min_ms': round(min(samples), 1),
+        'median_ms': round(statistics.median(samples), 1),
+        'p95_ms': round(percentile(samples, 95), 1),
+        'max_ms': round(max(samples), 1),
+        'samples_ms': [round(sample, 1) for sample in samples],
+        'python': sys.version.split()[0],
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+"""
+本地压测工具：按配置的请求比例，多线程并发访问应用，统计吞吐量、延迟分位数和错误率
+
+    python benchmarks/load_test.py                          # test_client，8线程，10秒
+    python benchmarks/load_test.py --mode server            # 在本地端口启动HTTP服务
+    python benchmarks/load_test.py --threads 16 --duration 30 \\
+        --mix list=40,search=20,get=20,create=5,update=5,favorite=8,import=1,export=1 \\
+        --output run.json
+
+使用临时数据库，不影响 address_book.db；结果以JSON输出（延迟单位：毫秒）
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_MIX = 'list=30,search=20,get=20,create=10,update=8,favorite=8,import=2,export=2'
+
+SEARCH_KEYWORDS = ['张', '李', '138', 'example', '同事', '朋友', 'zzz']
+
+
+class TestClientTransport:
+    """通过Flask test_client在进程内发请求（每个线程一个client）"""
+    __test__ = False  # 不是测试用例，避免被pytest收集
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def request(self, method, path, json_body=None, body=None, headers=None):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, json=json_body, data=body, headers=headers)
+        data = response.get_data()
+        response.close()
+        return response.status_code, data
+
+
+class HttpTransport:
+    """通过本地绑定的HTTP服务发请求"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def request(self, method, path, json_body=None, body=None, headers=None):
+        headers = dict(headers or {})
+        if json_body is not None:
+            body = json.dumps(json_body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        req = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+class ContactIds:
+    """压测过程中已知的联系人ID（线程安全）"""
+
+    def __init__(self, ids):
+        self.ids = list(ids)
+        self.lock = threading.Lock()
+
+    def add(self, contact_id):
+        with self.lock:
+            self.ids.append(contact_id)
+
+    def pick(self):
+        with self.lock:
+            return random.choice(self.ids) if self.ids else 1
+
+
+def random_contact(index=None):
+    index = index if index is not None else random.randint(0, 10 ** 6)
+    return {
+        'name': f'压测用户{index}',
+        'notes': random.choice(['同事', '朋友', '同学', '']),
+        'is_favorite': random.random() < 0.2,
+        'contact_methods': [
+            {'type': 'phone', 'value': f'138{random.randint(0, 10 ** 8 - 1):08d}', 'label': '手机'},
+            {'type': 'email', 'value': f'user{index}@example.com', 'label': '邮箱'}
+        ]
+    }
+
+
+def multipart_csv(rows):
+    """构造上传CSV文件的multipart请求体"""
+    lines = ['姓名,电话,邮箱,备注,是否收藏']
+    for i in range(rows):
+        contact = random_contact()
+        lines.append(f"{contact['name']}{i},{contact['contact_methods'][0]['value']},"
+                     f"{contact['contact_methods'][1]['value']},导入,否")
+    content = ('\n'.join(lines) + '\n').encode('utf-8-sig')
+
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\n'
+            'Content-Disposition: form-data; name="file"; filename="load_test.csv"\r\n'
+            'Content-Type: text/csv\r\n\r\n').encode('utf-8') + content + \
+        f'\r\n--{boundary}--\r\n'.encode('utf-8')
+    return body, {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+
+def build_operations(transport, ids, import_rows):
+    """各类请求：名称 -> 执行函数（返回HTTP状态码）"""
+
+    def op_list():
+        return transport.request('GET', '/api/contacts')[0]
+
+    def op_search():
+        return transport.request('GET', f'/api/contacts/search?q={urllib.request.quote(random.choice(SEARCH_KEYWORDS))}')[0]
+
+    def op_get():
+        return transport.request('GET', f'/api/contacts/{ids.pick()}')[0]
+
+    def op_create():
+        status, data = transport.request('POST', '/api/contacts', json_body=random_contact())
+        if status == 201:
+            ids.add(json.loads(data)['data']['id'])
+        return status
+
+    def op_update():
+        contact = random_contact()
+        return transport.request('PUT', f'/api/contacts/{ids.pick()}',
+                                 json_body={'notes': contact['notes'],
+                                            'contact_methods': contact['contact_methods']})[0]
+
+    def op_favorite():
+        return transport.request('PUT', f'/api/contacts/{ids.pick()}/favorite',
+                                 json_body={'is_favorite': random.random() < 0.5})[0]
+
+    def op_import():
+        body, headers = multipart_csv(import_rows)
+        return transport.request('POST', '/api/contacts/import', body=body, headers=headers)[0]
+
+    def op_export():
+        return transport.request('GET', f"/api/contacts/export?format={random.choice(['csv', 'xlsx'])}")[0]
+
+    return {
+        'list': op_list,
+        'search': op_search,
+        'get': op_get,
+        'create': op_create,
+        'update': op_update,
+        'favorite': op_favorite,
+        'import': op_import,
+        'export': op_export,
+    }
+
+
+def parse_mix(text, operations):
+    """解析请求比例配置，如 list=30,get=20"""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.strip().partition('=')
+        if name not in operations:
+            raise SystemExit(f'未知的请求类型: {name}（可选: {", ".join(operations)}）')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, errors, elapsed):
+    """生成每类请求的统计数据"""
+    report = {}
+    for name in sorted(set(latencies) | set(errors)):
+        samples = latencies.get(name, [])
+        count = len(samples)
+        report[name] = {
+            'requests': count,
+            'errors': errors.get(name, 0),
+            'error_rate': round(errors.get(name, 0) / count, 4) if count else 0.0,
+            'throughput_rps': round(count / elapsed, 2),
+            'p50_ms': round(percentile(samples, 50) * 1000, 2) if samples else None,
+            'p95_ms': round(percentile(samples, 95) * 1000, 2) if samples else None,
+            'p99_ms': round(percentile(samples, 99) * 1000, 2) if samples else None,
+            'mean_ms': round(statistics.mean(samples) * 1000, 2) if samples else None,
+            'max_ms': round(max(samples) * 1000, 2) if samples else None,
+        }
+    return report
+
+
+def run_load(operations, mix, threads, duration, max_requests):
+    """并发执行请求，返回 (每类延迟列表, 每类错误数, 实际耗时)"""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies = {name: [] for name in names}
+    errors = {}
+    lock = threading.Lock()
+    counter = {'sent': 0}
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        while time.perf_counter() < deadline:
+            with lock:
+                if max_requests and counter['sent'] >= max_requests:
+                    return
+                counter['sent'] += 1
+
+            name = random.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                status = operations[name]()
+                failed = status >= 400
+            except Exception:
+                failed = True
+            elapsed = time.perf_counter() - start
+
+            with lock:
+                latencies[name].append(elapsed)
+                if failed:
+                    errors[name] = errors.get(name, 0) + 1
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地压测工具')
+    parser.add_argument('--mode', choices=['client', 'server'], default='client',
+                        help='client: 进程内test_client；server: 本地绑定HTTP服务')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10, help='压测时长（秒）')
+    parser.add_argument('--requests', type=int, default=0, help='最多请求数，0表示不限制')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='请求比例，如 list=30,get=20')
+    parser.add_argument('--seed-contacts', type=int, default=500, help='预先写入的联系人数量')
+    parser.add_argument('--import-rows', type=int, default=50, help='每次导入请求的行数')
+    parser.add_argument('--config', default='production', help='应用配置名')
+    parser.add_argument('--verbose', action='store_true', help='显示应用的调试输出')
+    parser.add_argument('--output', help='结果写入的JSON文件')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 必须在导入应用之前设置，使用临时数据库和临时目录
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'load_test.db')
+
+        from app import create_app
+        from config import config
+        from database.models import db
+        from services.contact_service import ContactService
+
+        # 目录配置必须在create_app之前覆盖（租户注册表等在创建应用时就已初始化），
+        # 上传、导出快照和租户数据都写到临时目录，不影响仓库中的文件
+        class LoadTestConfig(config[args.config]):
+            UPLOAD_FOLDER = os.path.join(tmp, 'uploads')
+            EXPORT_CACHE_FOLDER = os.path.join(tmp, 'export_cache')
+            TENANT_FOLDER = os.path.join(tmp, 'tenants')
+
+        config['load_test'] = LoadTestConfig
+        app = create_app('load_test')
+
+        with app.app_context():
+            db.create_all()
+            contact_service = ContactService(db)
+            seeded = [contact_service.create_contact(random_contact(i))['id']
+                      for i in range(args.seed_contacts)]
+        ids = ContactIds(seeded)
+
+        server = None
+        if args.mode == 'server':
+            from werkzeug.serving import WSGIRequestHandler, make_server
+
+            class QuietRequestHandler(WSGIRequestHandler):
+                def log_request(self, *args, **kwargs):
+                    pass
+
+            server = make_server('127.0.0.1', 0, app, threaded=True,
+                                 request_handler=QuietRequestHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            transport = HttpTransport(f'http://127.0.0.1:{server.server_port}')
+        else:
+            transport = TestClientTransport(app)
+
+        operations = build_operations(transport, ids, args.import_rows)
+        mix = parse_mix(args.mix, operations)
+
+        # 应用的调试输出（print）会干扰计时，默认屏蔽
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with quiet:
+            latencies, errors, elapsed = run_load(operations, mix, args.threads,
+                                                  args.duration, args.requests)
+
+        if server:
+            server.shutdown()
+
+    total = sum(len(samples) for samples in latencies.values())
+    all_samples = [sample for samples in latencies.values() for sample in samples]
+    result = {
+        'mode': args.mode,
+        'config': args.config,
+        'threads': args.threads,
+        'mix': mix,
+        'seed_contacts': args.seed_contacts,
+        'duration_s': round(elapsed, 2),
+        'total_requests': total,
+        'total_errors': sum(errors.values()),
+        'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(all_samples, 50) * 1000, 2) if all_samples else None,
+        'p95_ms': round(percentile(all_samples, 95) * 1000, 2) if all_samples else None,
+        'p99_ms': round(percentile(all_samples, 99) * 1000, 2) if all_samples else None,
+        'endpoints': summarize(latencies, errors, elapsed),
+        'python': sys.version.split()[0],
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+命令行管理工具（flask --app app <命令>）
+"""
+import click
+from flask.cli import AppGroup
+
+from database.tenants import tenant_context
+
+# seed-db 使用的测试数据
+TEST_CONTACTS = [
+    {
+        'name': '张三',
+        'notes': '同事',
+        'is_favorite': True,
+        'contact_methods': [
+            {'type': 'phone', 'value': '13800138000', 'label': '工作电话'},
+            {'type': 'email', 'value': 'zhangsan@example.com', 'label': '工作邮箱'}
+        ]
+    },
+    {
+        'name': '李四',
+        'notes': '朋友',
+        'is_favorite': False,
+        'contact_methods': [
+            {'type': 'phone', 'value': '13900139000', 'label': '手机'},
+            {'type': 'address', 'value': '北京市海淀区', 'label': '家庭地址'}
+        ]
+    },
+    {
+        'name': '王五',
+        'notes': '同学',
+        'is_favorite': True,
+        'contact_methods': [
+            {'type': 'phone', 'value': '13700137000', 'label': '手机'},
+            {'type': 'social', 'value': '@wangwu', 'label': '微信'},
+            {'type': 'email', 'value': 'wangwu@example.com', 'label': '个人邮箱'}
+        ]
+    }
+]
+
+
+def register_commands(app):
+    """注册命令行命令"""
+
+    @app.cli.command('init-db')
+    @click.option('--tenant', default=None, help='租户ID，不指定时初始化默认数据库')
+    @click.option('--rebuild-lookup', is_flag=True, help='重建全部反查索引（号码规范化规则变化后使用）')
+    def init_db(tenant, rebuild_lookup):
+        """创建数据库表，并为旧数据建立反查索引"""
+        from database.models import db
+        from services.contact_service import ContactService
+
+        with tenant_context(app, tenant):
+            if tenant:
+                # 打开租户数据库时会自动建表
+                app.extensions['tenants'].get_engine(tenant)
+            else:
+                db.create_all()
+
+            # 旧数据库升级：为还没有反查索引的联系人建立索引
+            contact_service = ContactService(db)
+            if rebuild_lookup:
+                count = contact_service.rebuild_lookup_index()
+            else:
+                count = contact_service.backfill_lookup_index()
+            if count:
+                click.echo(f'已建立 {count} 条反查索引')
+
+        click.echo('✅ 数据库表创建完成！')
+
+    @app.cli.command('seed-db')
+    @click.option('--tenant', default=None, help='租户ID，不指定时使用默认数据库')
+    def seed_db(tenant):
+        """添加测试数据（仅在数据库为空时）"""
+        from database.models import db, Contact
+        from services.contact_service import ContactService
+
+        with tenant_context(app, tenant):
+            if Contact.query.count() > 0:
+                click.echo('数据库不为空，跳过')
+                return
+
+            contact_service = ContactService(db)
+            for contact_data in TEST_CONTACTS:
+                contact_service.create_contact(contact_data)
+
+        click.echo('测试数据添加完成！')
+
+    tenants_cli = AppGroup('tenants', help='租户分片管理')
+
+    @tenants_cli.command('list')
+    def list_tenants():
+        """列出所有租户分片"""
+        registry = app.extensions['tenants']
+        tenants = registry.list_tenants()
+        if not tenants:
+            click.echo('暂无租户')
+            return
+
+        for tenant in tenants:
+            click.echo(f"{tenant['tenant_id']}\t{tenant['size'] / 1024:.1f}KB\t{tenant['path']}")
+        click.echo(f'共 {len(tenants)} 个租户')
+
+    @tenants_cli.command('compact')
+    @click.argument('tenant_ids', nargs=-1)
+    def compact_tenants(tenant_ids):
+        """压缩租户分片（VACUUM），不指定租户时压缩全部"""
+        registry = app.extensions['tenants']
+        if not tenant_ids:
+            tenant_ids = [tenant['tenant_id'] for tenant in registry.list_tenants()]
+
+        for tenant_id in tenant_ids:
+            try:
+                before, after = registry.compact(tenant_id)
+                click.echo(f'{tenant_id}: {before / 1024:.1f}KB -> {after / 1024:.1f}KB')
+            except ValueError as e:
+                click.echo(f'{tenant_id}: {e}', err=True)
+
+    app.cli.add_command(tenants_cli)
@@ -10,25 +10,59 @@ class Config:
                               'sqlite:///' + os.path.join(basedir, 'address_book.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # 启动时不检查表结构，由 flask init-db 创建
+    AUTO_CREATE_SCHEMA = False
+
     # 文件上传配置
     UPLOAD_FOLDER = os.path.join(basedir, 'static', 'uploads')
-    ALLOWED_EXTENSIONS = {'xlsx', 'xls', 'csv'}
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+    ALLOWED_EXTENSIONS = {'xlsx', 'csv', 'vcf', 'vcard', 'ndjson', 'jsonl'}
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB，单次请求上限；更大的文件使用分块上传
+    UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024  # 分块上传的分块大小
+    UPLOAD_SESSION_TTL = 24 * 3600  # 未完成的分块上传保留时间（秒）
+    UPLOAD_MAX_SIZE = 1024 * 1024 * 1024  # 分块上传单个文件的上限（1GB）
+
+    # 导入校验配置
+    IMPORT_VALIDATION_WORKERS = None  # 校验进程数，None表示CPU核数
+    IMPORT_VALIDATION_CHUNK_SIZE = 5000  # 每个校验任务的行数
+
+    # 反查接口配置
+    LOOKUP_BATCH_MAX = 10000  # 批量反查单次最多号码/邮箱数量
+
+    # 导出快照配置
+    EXPORT_CACHE_FOLDER = os.path.join(basedir, 'export_cache')
+    EXPORT_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 512MB
+    EXPORT_CACHE_MAX_AGE = 24 * 3600  # 超过一天未访问的快照会被删除
+
+    # 多租户配置：每个租户一个SQLite文件，未指定租户时使用默认数据库
+    TENANT_HEADER = 'X-Tenant-ID'
+    TENANT_FOLDER = os.path.join(basedir, 'tenants')
+    TENANT_ENGINE_POOL_SIZE = 32  # 同时打开的租户数据库数量上限
+
+    # 延迟写入配置：收藏状态等小更新合并后批量写入
+    WRITE_BEHIND_ENABLED = False
+    WRITE_BEHIND_INTERVAL = 0.5  # 最长延迟时间（秒）
+    WRITE_BEHIND_BATCH_SIZE = 200  # 待写入的联系人数达到该值时立即写入
+
+    # 缓存配置
+    CONTACT_CACHE_SIZE = 1024  # 单个联系人缓存条数，0表示关闭
+    LIST_CACHE_SIZE = 64  # 列表结果缓存条数
 
     @staticmethod
     def init_app(app):
         # 确保上传目录存在
-        upload_folder = os.path.join(basedir, 'static', 'uploads')
+        upload_folder = app.config['UPLOAD_FOLDER']
         if not os.path.exists(upload_folder):
             os.makedirs(upload_folder)
 
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    AUTO_CREATE_SCHEMA = True  # 第一个请求时自动建表
 
 
 class ProductionConfig(Config):
     DEBUG = False
+    AUTO_CREATE_SCHEMA = False  # 部署时执行 flask --app wsgi init-db
 
 
 config = {
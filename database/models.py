@@ -1,7 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 
-db = SQLAlchemy()
+from database.tenants import TenantSession
+
+# 会话按当前租户选择数据库（见 database/tenants.py）
+db = SQLAlchemy(session_options={'class_': TenantSession})
 
 
 # 联系方式模型
@@ -23,6 +26,43 @@ class ContactMethod(db.Model):
         }
 
 
+# 联系方式反查索引（规范化后的电话/邮箱 -> 联系人）
+class ContactLookup(db.Model):
+    __tablename__ = 'contact_lookup'
+    __table_args__ = (
+        db.Index('ix_contact_lookup_type_value', 'method_type', 'normalized_value'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    contact_id = db.Column(db.Integer, db.ForeignKey('contacts.id'), index=True)
+    method_type = db.Column(db.String(20))  # phone, email
+    normalized_value = db.Column(db.String(200))
+
+
+# 分组成员关系表（联系人 <-> 分组），按分组和按联系人两个方向都有索引
+group_members = db.Table(
+    'group_members',
+    db.Column('group_id', db.Integer, db.ForeignKey('contact_groups.id'), primary_key=True),
+    db.Column('contact_id', db.Integer, db.ForeignKey('contacts.id'), primary_key=True),
+    db.Index('ix_group_members_contact_id', 'contact_id')
+)
+
+
+# 分组/标签模型
+class Group(db.Model):
+    __tablename__ = 'contact_groups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False, unique=True, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name
+        }
+
+
 # 联系人模型
 class Contact(db.Model):
     __tablename__ = 'contacts'
@@ -39,6 +79,13 @@ class Contact(db.Model):
                                       backref='contact',
                                       lazy=True,
                                       cascade='all, delete-orphan')
+    lookup_entries = db.relationship('ContactLookup',
+                                     lazy=True,
+                                     cascade='all, delete-orphan')
+    groups = db.relationship('Group',
+                             secondary=group_members,
+                             lazy='selectin',
+                             order_by='Group.name')
 
     def to_dict(self):
         return {
@@ -46,7 +93,16 @@ class Contact(db.Model):
             'name': self.name,
             'notes': self.notes,
             'is_favorite': self.is_favorite,
+            'tags': [group.name for group in self.groups],
             'contact_methods': [method.to_dict() for method in self.contact_methods],
             'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
             'updated_at': self.updated_at.strftime('%Y-%m-%d %H:%M:%S')
-        }
\ No newline at end of file
+        }
+
+
+# 数据版本号（单行表），每次写入时递增，多进程据此判断缓存是否过期
+class DataVersion(db.Model):
+    __tablename__ = 'data_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
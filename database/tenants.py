@@ -0,0 +1,173 @@
+"""
+多租户支持：每个租户一个独立的SQLite文件（分片）
+请求通过请求头或 /t/<tenant_id>/ 路径前缀指定租户，
+数据库会话按当前租户选择对应的引擎
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+
+TENANT_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def is_valid_tenant_id(tenant_id):
+    """租户ID只允许字母、数字、下划线和横线，避免路径穿越"""
+    return bool(tenant_id) and bool(TENANT_ID_RE.match(tenant_id))
+
+
+def current_tenant_id():
+    """获取当前请求的租户ID，未指定时返回None（使用默认数据库）"""
+    if has_app_context():
+        return g.get('tenant_id')
+    return None
+
+
+@contextmanager
+def tenant_context(app, tenant_id):
+    """
+    在指定租户下执行代码（命令行工具、后台任务等没有请求的场景）
+
+    用法：
+        with tenant_context(app, 'acme'):
+            Contact.query.count()
+    """
+    with app.app_context():
+        g.tenant_id = tenant_id
+        yield
+
+
+class TenantRegistry:
+    """
+    租户引擎池
+
+    按需打开租户数据库（首次访问时建表），
+    只保留最近使用的max_engines个引擎，超出时释放最久未使用的引擎
+    """
+
+    def __init__(self, folder, metadata, max_engines=32):
+        """
+        参数：
+            folder: str, 租户数据库文件所在目录
+            metadata: MetaData, 建表使用的元数据（db.metadata）
+            max_engines: int, 同时打开的引擎数量上限
+        """
+        self.folder = folder
+        self.metadata = metadata
+        self.max_engines = max_engines
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+
+    def shard_path(self, tenant_id):
+        """租户数据库文件路径"""
+        if not is_valid_tenant_id(tenant_id):
+            raise ValueError(f'无效的租户ID: {tenant_id}')
+        return os.path.join(self.folder, f'{tenant_id}.db')
+
+    def get_engine(self, tenant_id):
+        """获取租户引擎，不存在时创建数据库文件并建表"""
+        with self._lock:
+            engine = self._engines.get(tenant_id)
+            if engine is not None:
+                self._engines.move_to_end(tenant_id)
+                return engine
+
+            path = self.shard_path(tenant_id)
+            os.makedirs(self.folder, exist_ok=True)
+            engine = create_engine('sqlite:///' + path)
+            self.metadata.create_all(engine)
+
+            self._engines[tenant_id] = engine
+            while len(self._engines) > self.max_engines:
+                _, evicted = self._engines.popitem(last=False)
+                evicted.dispose()
+            return engine
+
+    def list_tenants(self):
+        """
+        列出所有租户分片
+
+        返回：
+            list: [{'tenant_id', 'path', 'size', 'open'}]
+        """
+        if not os.path.isdir(self.folder):
+            return []
+
+        tenants = []
+        for name in sorted(os.listdir(self.folder)):
+            tenant_id, ext = os.path.splitext(name)
+            if ext != '.db' or not is_valid_tenant_id(tenant_id):
+                continue
+            path = os.path.join(self.folder, name)
+            tenants.append({
+                'tenant_id': tenant_id,
+                'path': path,
+                'size': os.path.getsize(path),
+                'open': tenant_id in self._engines
+            })
+        return tenants
+
+    def compact(self, tenant_id):
+        """
+        压缩租户分片（VACUUM + ANALYZE）
+
+        返回：
+            tuple: (压缩前大小, 压缩后大小)
+        """
+        path = self.shard_path(tenant_id)
+        if not os.path.exists(path):
+            raise ValueError(f'租户不存在: {tenant_id}')
+
+        size_before = os.path.getsize(path)
+        engine = self.get_engine(tenant_id)
+        # VACUUM不能在事务中执行
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text('VACUUM'))
+            conn.execute(text('ANALYZE'))
+        return size_before, os.path.getsize(path)
+
+    def dispose_all(self):
+        """释放所有引擎"""
+        with self._lock:
+            for engine in self._engines.values():
+                engine.dispose()
+            self._engines.clear()
+
+
+class TenantSession(Session):
+    """按当前租户选择引擎的会话，未指定租户时使用默认数据库"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            tenant_id = current_tenant_id()
+            if tenant_id:
+                return current_app.extensions['tenants'].get_engine(tenant_id)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class TenantPathMiddleware:
+    """
+    WSGI中间件：把 /t/<tenant_id>/... 形式的路径转换成租户请求头
+
+    例如 /t/acme/api/contacts 会按 /api/contacts 处理，并设置 X-Tenant-ID: acme
+    """
+
+    def __init__(self, wsgi_app, header='X-Tenant-ID'):
+        self.wsgi_app = wsgi_app
+        self.environ_key = 'HTTP_' + header.upper().replace('-', '_')
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path.startswith('/t/'):
+            parts = path.split('/', 3)
+            if len(parts) >= 3 and parts[2]:
+                tenant_id = parts[2]
+                environ[self.environ_key] = tenant_id
+                environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + f'/t/{tenant_id}'
+                environ['PATH_INFO'] = '/' + (parts[3] if len(parts) > 3 else '')
+        return self.wsgi_app(environ, start_response)
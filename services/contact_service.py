@@ -1,20 +1,158 @@
-from database.models import db, Contact, ContactMethod
+from database.models import db, Contact, ContactMethod, ContactLookup, DataVersion, Group, group_members
 from datetime import datetime
+import threading
+from collections import OrderedDict
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import selectinload
+from database.tenants import current_tenant_id, tenant_context
+from utils.lru_cache import LRUCache
+from utils.normalizer import normalize_phone, normalize_email, normalize_method_value
+
+# SQLite单条语句的变量数量有限制，IN查询需要分批
+LOOKUP_BATCH_SIZE = 500
+
+
+def _ids_to_bitmap(ids):
+    """把一组联系人ID转换成整数位图（先在bytearray中置位，避免反复创建大整数）"""
+    bits = bytearray()
+    for contact_id in ids:
+        index = contact_id >> 3
+        if index >= len(bits):
+            bits.extend(bytes(index - len(bits) + 1))
+        bits[index] |= 1 << (contact_id & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class TenantCache:
+    """单个租户（数据库）的缓存及其对应的数据版本号"""
+    
+    def __init__(self, cache_size, list_cache_size):
+        self.contacts = LRUCache(cache_size)
+        self.lists = LRUCache(list_cache_size)
+        self.version = None
+        self.group_bitmaps = None
+        self.lock = threading.Lock()
+    
+    def sync(self, version):
+        """数据版本号变化时清空缓存"""
+        with self.lock:
+            if version != self.version:
+                self.clear()
+                self.version = version
+    
+    def set(self, store, key, value, version):
+        """写入缓存；若读取期间版本号已变化则放弃，避免缓存旧数据"""
+        with self.lock:
+            if version == self.version:
+                store.set(key, value)
+    
+    def invalidate(self):
+        """本进程写入后清空缓存，并让读取中的旧结果无法写入"""
+        with self.lock:
+            self.clear()
+            self.version = None
+    
+    def clear(self):
+        self.contacts.clear()
+        self.lists.clear()
+        self.group_bitmaps = None
+    
+    def stats(self):
+        return {
+            'data_version': self.version,
+            'contacts': self.contacts.stats(),
+            'lists': self.lists.stats()
+        }
+
 
 class ContactService:
-    def __init__(self, db_session):
-        """初始化ContactService"""
+    def __init__(self, db_session, cache_size=1024, list_cache_size=64, max_tenants=32):
+        """
+        初始化ContactService
+        
+        参数：
+            db_session: SQLAlchemy实例
+            cache_size: int, 单个联系人序列化结果的缓存容量，0表示不缓存
+            list_cache_size: int, 列表结果（全部/收藏/搜索）的缓存容量
+            max_tenants: int, 同时保留缓存的租户数量
+        """
         self.db = db_session
+        self.cache_size = cache_size
+        self.list_cache_size = list_cache_size
+        self.max_tenants = max_tenants
+        self._tenant_caches = OrderedDict()
+        self._tenant_lock = threading.Lock()
+        self.write_behind = None
+    
+    def enable_write_behind(self, app, interval=0.5, batch_size=200):
+        """
+        开启延迟写入：收藏状态等小更新先进入队列，按联系人合并后批量写入
+        
+        参数：
+            app: Flask应用（后台线程写入时需要应用上下文）
+            interval: float, 最长延迟时间（秒）
+            batch_size: int, 待写入的联系人数达到该值时立即写入
+        """
+        from services.write_behind import WriteBehindQueue
+        
+        def flush(tenant_id, updates):
+            self._flush_updates(app, tenant_id, updates)
+        
+        self.write_behind = WriteBehindQueue(flush, interval=interval, batch_size=batch_size)
+    
+    def flush_pending(self):
+        """立即写入当前租户尚未写入的延迟更新"""
+        if self.write_behind:
+            self.write_behind.flush(current_tenant_id())
     
     def get_all_contacts(self):
         """获取所有联系人"""
+        cache, version = self._sync_cache_version()
+        cached = cache.lists.get('all')
+        if cached is not None:
+            return self._with_pending_list(cached)
+        
         contacts = Contact.query.order_by(Contact.created_at.desc()).all()
-        return [contact.to_dict() for contact in contacts]
+        result = [contact.to_dict() for contact in contacts]
+        cache.set(cache.lists, 'all', result, version)
+        return self._with_pending_list(result)
+    
+    def iter_contacts(self, batch_size=500):
+        """
+        分批遍历所有联系人（用于导出），按ID倒序即创建时间倒序
+        
+        每批只加载 batch_size 个联系人，不经过列表缓存，内存占用与联系人总数无关
+        
+        返回：
+            generator: 逐个产出联系人数据（to_dict格式）
+        """
+        last_id = None
+        while True:
+            query = Contact.query.options(selectinload(Contact.contact_methods),
+                                          selectinload(Contact.groups))
+            if last_id is not None:
+                query = query.filter(Contact.id < last_id)
+            batch = query.order_by(Contact.id.desc()).limit(batch_size).all()
+            if not batch:
+                return
+        
+            last_id = batch[-1].id
+            for contact in batch:
+                yield self._with_pending(contact.to_dict())
     
     def get_contact_by_id(self, contact_id):
         """根据ID获取联系人"""
+        cache, version = self._sync_cache_version()
+        cached = cache.contacts.get(contact_id)
+        if cached is not None:
+            return self._with_pending(cached)
+        
         contact = Contact.query.get(contact_id)
-        return contact.to_dict() if contact else None
+        if not contact:
+            return None
+        result = contact.to_dict()
+        cache.set(cache.contacts, contact_id, result, version)
+        return self._with_pending(result)
     
     def create_contact(self, data):
         """创建联系人"""
@@ -32,9 +170,11 @@ class ContactService:
                 label=method_data.get('label', '默认')
             )
             contact.contact_methods.append(method)
+        contact.lookup_entries = self._build_lookup_entries(data.get('contact_methods', []))
+        contact.groups = self._resolve_groups(data.get('tags', []))
         
         self.db.session.add(contact)
-        self.db.session.commit()
+        self._commit()
         return contact.to_dict()
     
     def update_contact(self, contact_id, data):
@@ -48,6 +188,8 @@ class ContactService:
             contact.name = data['name']
         if 'notes' in data:
             contact.notes = data['notes']
+        if 'tags' in data:
+            contact.groups = self._resolve_groups(data['tags'])
         
         # 更新联系方式
         if 'contact_methods' in data:
@@ -62,20 +204,30 @@ class ContactService:
                     label=method_data.get('label', '默认')
                 )
                 contact.contact_methods.append(method)
+            
+            # 同步反查索引
+            contact.lookup_entries = self._build_lookup_entries(data['contact_methods'])
         
         contact.updated_at = datetime.utcnow()
-        self.db.session.commit()
+        self._commit()
         return contact.to_dict()
     
     def toggle_favorite(self, contact_id, is_favorite):
         """切换收藏状态"""
+        if self.write_behind:
+            # 延迟写入：合并到队列中，读取时仍能看到新状态
+            if not self.get_contact_by_id(contact_id):
+                return None
+            self.write_behind.put(current_tenant_id(), contact_id, {'is_favorite': bool(is_favorite)})
+            return self.get_contact_by_id(contact_id)
+        
         contact = Contact.query.get(contact_id)
         if not contact:
             return None
         
         contact.is_favorite = is_favorite
         contact.updated_at = datetime.utcnow()
-        self.db.session.commit()
+        self._commit()
         return contact.to_dict()
     
     def delete_contact(self, contact_id):
@@ -85,18 +237,33 @@ class ContactService:
             return False
         
         self.db.session.delete(contact)
-        self.db.session.commit()
+        self._commit()
         return True
     
     def get_favorite_contacts(self):
         """获取收藏的联系人"""
+        # 按收藏状态筛选，需要先写入延迟的更新
+        self.flush_pending()
+        cache, version = self._sync_cache_version()
+        cached = cache.lists.get('favorites')
+        if cached is not None:
+            return cached
+        
         favorites = Contact.query.filter_by(is_favorite=True)\
                                  .order_by(Contact.updated_at.desc())\
                                  .all()
-        return [contact.to_dict() for contact in favorites]
+        result = [contact.to_dict() for contact in favorites]
+        cache.set(cache.lists, 'favorites', result, version)
+        return result
     
     def search_contacts(self, keyword):
         """搜索联系人"""
+        cache, version = self._sync_cache_version()
+        cache_key = ('search', keyword)
+        cached = cache.lists.get(cache_key)
+        if cached is not None:
+            return self._with_pending_list(cached)
+        
         # 搜索姓名和备注
         contacts = Contact.query.filter(
             (Contact.name.contains(keyword)) |
@@ -112,4 +279,380 @@ class ContactService:
         contact_ids.update([m.contact_id for m in methods])
         
         result_contacts = Contact.query.filter(Contact.id.in_(contact_ids)).all()
-        return [contact.to_dict() for contact in result_contacts]
\ No newline at end of file
+        result = [contact.to_dict() for contact in result_contacts]
+        cache.set(cache.lists, cache_key, result, version)
+        return self._with_pending_list(result)
+    
+    def lookup_by_phone(self, phone):
+        """根据电话号码反查联系人（走规范化索引）"""
+        normalized = normalize_phone(phone)
+        if not normalized:
+            return []
+        return self._lookup('phone', [normalized]).get(normalized, [])
+    
+    def lookup_by_email(self, email):
+        """根据邮箱反查联系人（走规范化索引）"""
+        normalized = normalize_email(email)
+        if not normalized:
+            return []
+        return self._lookup('email', [normalized]).get(normalized, [])
+    
+    def batch_lookup(self, phones=None, emails=None):
+        """
+        批量反查联系人
+        
+        返回：
+            dict: {'phones': {原始号码: [联系人]}, 'emails': {原始邮箱: [联系人]}}
+        """
+        result = {'phones': {}, 'emails': {}}
+        for key, method_type, normalize, values in (
+                ('phones', 'phone', normalize_phone, phones or []),
+                ('emails', 'email', normalize_email, emails or [])):
+            normalized_map = {value: normalize(value) for value in values}
+            found = self._lookup(method_type, [v for v in normalized_map.values() if v])
+            for value, normalized in normalized_map.items():
+                result[key][value] = found.get(normalized, [])
+        return result
+    
+    def rebuild_lookup_index(self):
+        """根据现有联系方式重建全部反查索引（号码规范化规则变化后使用）"""
+        ContactLookup.query.delete()
+        count = self.backfill_lookup_index()
+        if not count:
+            self._commit()
+        return count
+    
+    def backfill_lookup_index(self):
+        """
+        为还没有反查索引的联系人建立索引（旧数据升级）
+        
+        返回：
+            int: 新建的索引条目数
+        """
+        methods = ContactMethod.query\
+            .outerjoin(ContactLookup, ContactLookup.contact_id == ContactMethod.contact_id)\
+            .filter(ContactMethod.method_type.in_(['phone', 'email']),
+                    ContactLookup.id.is_(None))\
+            .order_by(ContactMethod.contact_id)\
+            .all()
+        
+        methods_by_contact = {}
+        for method in methods:
+            methods_by_contact.setdefault(method.contact_id, []).append(
+                {'type': method.method_type, 'value': method.value})
+        
+        count = 0
+        for contact_id, methods_data in methods_by_contact.items():
+            for entry in self._build_lookup_entries(methods_data):
+                entry.contact_id = contact_id
+                self.db.session.add(entry)
+                count += 1
+        
+        if count:
+            self._commit()
+        return count
+    
+    # ========== 分组/标签 ==========
+    
+    def get_groups(self):
+        """获取所有分组及其联系人数量"""
+        rows = self.db.session.query(Group, func.count(group_members.c.contact_id))\
+            .outerjoin(group_members, Group.id == group_members.c.group_id)\
+            .group_by(Group.id)\
+            .order_by(Group.name)\
+            .all()
+        return [dict(group.to_dict(), count=count) for group, count in rows]
+    
+    def create_group(self, name):
+        """创建分组"""
+        name = (name or '').strip()
+        if not name:
+            raise ValueError('分组名称不能为空')
+        if Group.query.filter_by(name=name).first():
+            raise ValueError(f'分组已存在: {name}')
+        
+        group = Group(name=name)
+        self.db.session.add(group)
+        self._commit()
+        return dict(group.to_dict(), count=0)
+    
+    def delete_group(self, group_id):
+        """删除分组（不删除联系人）"""
+        group = Group.query.get(group_id)
+        if not group:
+            return False
+        
+        self.db.session.execute(
+            group_members.delete().where(group_members.c.group_id == group_id)
+        )
+        self.db.session.delete(group)
+        self._commit()
+        return True
+    
+    def set_contact_tags(self, contact_id, tags):
+        """设置联系人的分组，不存在的分组会自动创建"""
+        contact = Contact.query.get(contact_id)
+        if not contact:
+            return None
+        
+        contact.groups = self._resolve_groups(tags)
+        contact.updated_at = datetime.utcnow()
+        self._commit()
+        return contact.to_dict()
+    
+    def query_group_contacts(self, all_of=None, any_of=None, none_of=None, page=1, per_page=50):
+        """
+        按分组集合查询联系人（在SQL中完成集合运算）
+        
+        参数：
+            all_of: list, 同时属于这些分组（A AND B）
+            any_of: list, 属于其中任意一个分组（A OR B）
+            none_of: list, 不属于这些分组（NOT C）
+            page: int, 页码（从1开始）
+            per_page: int, 每页数量
+        
+        返回：
+            dict: {'items': [联系人], 'total', 'page', 'per_page', 'pages'}
+        """
+        query = self._group_filter(Contact.query, all_of or [], any_of or [], none_of or [])
+        if query is None:
+            return {'items': [], 'total': 0, 'page': page, 'per_page': per_page, 'pages': 0}
+        
+        pagination = query.order_by(Contact.created_at.desc(), Contact.id.desc())\
+            .paginate(page=page, per_page=per_page, error_out=False)
+        return {
+            'items': self._with_pending_list([contact.to_dict() for contact in pagination.items]),
+            'total': pagination.total,
+            'page': pagination.page,
+            'per_page': pagination.per_page,
+            'pages': pagination.pages
+        }
+    
+    def count_group_contacts(self, all_of=None, any_of=None, none_of=None):
+        """
+        用内存中的分组位图统计满足集合条件的联系人数量
+        
+        位图按数据版本号缓存，数据变化后重新从数据库加载
+        """
+        bitmaps, universe = self._group_bitmaps()
+        
+        result = universe
+        for name in all_of or []:
+            result &= bitmaps.get(name, 0)
+        if any_of:
+            union = 0
+            for name in any_of:
+                union |= bitmaps.get(name, 0)
+            result &= union
+        for name in none_of or []:
+            result &= ~bitmaps.get(name, 0)
+        
+        return bin(result).count('1')
+    
+    def _group_filter(self, query, all_of, any_of, none_of):
+        """给查询加上分组集合条件；条件不可能满足时返回None"""
+        names = set(all_of) | set(any_of) | set(none_of)
+        group_ids = dict(
+            self.db.session.query(Group.name, Group.id).filter(Group.name.in_(names)).all()
+        ) if names else {}
+        
+        if all_of:
+            if any(name not in group_ids for name in all_of):
+                return None
+            ids = list(set(group_ids[name] for name in all_of))
+            query = query.filter(Contact.id.in_(
+                select(group_members.c.contact_id)
+                .where(group_members.c.group_id.in_(ids))
+                .group_by(group_members.c.contact_id)
+                .having(func.count() == len(ids))
+            ))
+        
+        if any_of:
+            ids = [group_ids[name] for name in any_of if name in group_ids]
+            if not ids:
+                return None
+            query = query.filter(Contact.id.in_(
+                select(group_members.c.contact_id).where(group_members.c.group_id.in_(ids))
+            ))
+        
+        exclude_ids = [group_ids[name] for name in none_of if name in group_ids]
+        if exclude_ids:
+            query = query.filter(~Contact.id.in_(
+                select(group_members.c.contact_id).where(group_members.c.group_id.in_(exclude_ids))
+            ))
+        
+        return query
+    
+    def _group_bitmaps(self):
+        """
+        获取当前租户的分组位图
+        
+        返回：
+            tuple: ({分组名: 位图}, 所有联系人的位图)，第n位表示ID为n的联系人
+        """
+        cache, version = self._sync_cache_version()
+        cached = cache.group_bitmaps
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        
+        universe = _ids_to_bitmap(contact_id for (contact_id,) in self.db.session.query(Contact.id))
+        
+        members = {}
+        rows = self.db.session.query(Group.name, group_members.c.contact_id)\
+            .join(group_members, Group.id == group_members.c.group_id)
+        for name, contact_id in rows:
+            members.setdefault(name, []).append(contact_id)
+        bitmaps = {name: _ids_to_bitmap(ids) for name, ids in members.items()}
+        
+        with cache.lock:
+            if version == cache.version:
+                cache.group_bitmaps = (version, bitmaps, universe)
+        return bitmaps, universe
+    
+    def _resolve_groups(self, tags):
+        """根据标签名获取分组，不存在的自动创建"""
+        names = []
+        for tag in tags or []:
+            tag = str(tag).strip()
+            if tag and tag not in names:
+                names.append(tag)
+        if not names:
+            return []
+        
+        existing = {group.name: group for group in Group.query.filter(Group.name.in_(names)).all()}
+        groups = []
+        for name in names:
+            group = existing.get(name)
+            if group is None:
+                group = Group(name=name)
+                self.db.session.add(group)
+            groups.append(group)
+        return groups
+    
+    def get_data_version(self):
+        """获取当前数据版本号（每次写入递增）"""
+        version = self.db.session.execute(
+            select(DataVersion.version).where(DataVersion.id == 1)
+        ).scalar()
+        return version or 0
+    
+    def get_cache_stats(self):
+        """获取当前租户的缓存命中统计"""
+        return self._tenant_cache().stats()
+    
+    def clear_cache(self):
+        """清空本进程中当前租户的缓存"""
+        self._tenant_cache().clear()
+    
+    def _tenant_cache(self):
+        """获取当前租户的缓存，只保留最近使用的max_tenants个租户"""
+        tenant_id = current_tenant_id()
+        with self._tenant_lock:
+            cache = self._tenant_caches.get(tenant_id)
+            if cache is None:
+                cache = TenantCache(self.cache_size, self.list_cache_size)
+                self._tenant_caches[tenant_id] = cache
+                while len(self._tenant_caches) > self.max_tenants:
+                    self._tenant_caches.popitem(last=False)
+            else:
+                self._tenant_caches.move_to_end(tenant_id)
+            return cache
+    
+    def _sync_cache_version(self):
+        """
+        检查数据版本号，若其他进程写入过数据则清空本进程缓存
+        
+        版本号存放在数据库的单行表中，所有进程共享，
+        比起PRAGMA data_version（按连接计数）在连接池下更可靠
+        
+        返回：
+            tuple: (当前租户的缓存, 数据版本号)
+        """
+        cache = self._tenant_cache()
+        version = self.get_data_version()
+        cache.sync(version)
+        return cache, version
+    
+    def _commit(self):
+        """递增数据版本号并提交事务，同时让本进程缓存失效"""
+        result = self.db.session.execute(
+            update(DataVersion)
+            .where(DataVersion.id == 1)
+            .values(version=DataVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            self.db.session.add(DataVersion(id=1, version=1))
+        
+        self.db.session.commit()
+        self._tenant_cache().invalidate()
+    
+    def _with_pending(self, contact_dict):
+        """叠加尚未写入数据库的延迟更新（返回新字典，不修改缓存中的数据）"""
+        if not self.write_behind or contact_dict is None:
+            return contact_dict
+        fields = self.write_behind.overlay(current_tenant_id(), contact_dict['id'])
+        return {**contact_dict, **fields} if fields else contact_dict
+    
+    def _with_pending_list(self, contacts):
+        if not self.write_behind or not self.write_behind.has_pending(current_tenant_id()):
+            return contacts
+        return [self._with_pending(contact) for contact in contacts]
+    
+    def _flush_updates(self, app, tenant_id, updates):
+        """在一个事务中写入一个租户的延迟更新"""
+        with tenant_context(app, tenant_id):
+            now = datetime.utcnow()
+            for contact_id, fields in updates.items():
+                self.db.session.execute(
+                    update(Contact)
+                    .where(Contact.id == contact_id)
+                    .values(updated_at=now, **fields)
+                )
+            self._commit()
+    
+    def _build_lookup_entries(self, methods_data):
+        """根据联系方式数据生成反查索引条目"""
+        entries = []
+        seen = set()
+        for method_data in methods_data:
+            method_type = method_data.get('type')
+            normalized = normalize_method_value(method_type, method_data.get('value'))
+            if normalized and (method_type, normalized) not in seen:
+                seen.add((method_type, normalized))
+                entries.append(ContactLookup(
+                    method_type=method_type,
+                    normalized_value=normalized
+                ))
+        return entries
+    
+    def _lookup(self, method_type, normalized_values):
+        """
+        在反查索引中查找一批规范化值
+        
+        返回：
+            dict: {规范化值: [联系人]}
+        """
+        values = list(set(normalized_values))
+        matches = []
+        for i in range(0, len(values), LOOKUP_BATCH_SIZE):
+            batch = values[i:i + LOOKUP_BATCH_SIZE]
+            matches.extend(
+                self.db.session.query(ContactLookup.normalized_value, ContactLookup.contact_id)
+                .filter(ContactLookup.method_type == method_type,
+                        ContactLookup.normalized_value.in_(batch))
+                .all()
+            )
+        
+        contact_ids = list(set(contact_id for _, contact_id in matches))
+        contacts = {}
+        for i in range(0, len(contact_ids), LOOKUP_BATCH_SIZE):
+            batch = contact_ids[i:i + LOOKUP_BATCH_SIZE]
+            query = Contact.query.options(selectinload(Contact.contact_methods))
+            for contact in query.filter(Contact.id.in_(batch)).all():
+                contacts[contact.id] = self._with_pending(contact.to_dict())
+        
+        result = {}
+        for normalized, contact_id in matches:
+            if contact_id in contacts:
+                result.setdefault(normalized, []).append(contacts[contact_id])
+        return result
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+
+from werkzeug.utils import secure_filename
+
+UPLOAD_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+COPY_BUFFER_SIZE = 64 * 1024
+MISSING_CHUNKS_LIMIT = 100  # 会话状态中最多列出的缺失分块序号
+
+
+class UploadService:
+    """
+    分块上传：先创建上传会话，再逐块上传（可断点续传），最后合并成完整文件
+
+    每个会话对应 UPLOAD_FOLDER/chunks/<upload_id>/ 目录，
+    其中 meta.json 保存会话信息，每个分块保存为 <序号>.part，
+    会话状态全部在磁盘上，多个worker进程之间共享
+    """
+
+    def __init__(self, upload_folder, chunk_size=4 * 1024 * 1024, session_ttl=24 * 3600,
+                 max_size=1024 * 1024 * 1024):
+        """
+        初始化UploadService
+
+        参数：
+            upload_folder: str, 上传目录
+            chunk_size: int, 分块大小（字节）
+            session_ttl: int, 未完成的上传会话保留时间（秒）
+            max_size: int, 单个文件的最大大小（字节）
+        """
+        self.upload_folder = upload_folder
+        self.chunks_folder = os.path.join(upload_folder, 'chunks')
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.session_ttl = session_ttl
+
+    def create_session(self, filename, total_size, checksum=None):
+        """
+        创建上传会话
+
+        参数：
+            filename: str, 原始文件名
+            total_size: int, 文件总大小（字节）
+            checksum: str, 整个文件的SHA-256（可选，合并时校验）
+
+        返回：
+            dict: 会话信息
+        """
+        if not filename:
+            raise ValueError('缺少文件名')
+        if not isinstance(total_size, int) or total_size <= 0:
+            raise ValueError('文件大小必须是正整数')
+        if total_size > self.max_size:
+            raise ValueError(f'文件大小超过上限: {self.max_size}字节')
+
+        self.cleanup_expired()
+
+        upload_id = uuid.uuid4().hex
+        meta = {
+            'upload_id': upload_id,
+            'filename': filename,
+            'total_size': total_size,
+            'chunk_size': self.chunk_size,
+            'total_chunks': (total_size + self.chunk_size - 1) // self.chunk_size,
+            'checksum': checksum.lower() if checksum else None,
+            'created_at': time.time()
+        }
+
+        session_dir = self._session_dir(upload_id)
+        os.makedirs(session_dir)
+        with open(os.path.join(session_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        return self.get_session(upload_id)
+
+    def get_session(self, upload_id):
+        """
+        获取上传会话状态
+
+        返回：
+            dict: 会话信息，包含已收到的分块、缺失分块数量（及前若干个缺失序号）
+                  和可续传的偏移量；会话不存在时返回None
+        """
+        meta = self._load_meta(upload_id)
+        if meta is None:
+            return None
+
+        received = self._received_chunks(upload_id)
+        # 从头开始连续收到的分块数，客户端从该偏移量继续上传
+        contiguous = 0
+        while contiguous in received:
+            contiguous += 1
+
+        meta['received_chunks'] = sorted(received)
+        meta['missing_count'] = meta['total_chunks'] - len(received)
+        meta['missing_chunks'] = self._first_missing(received, meta['total_chunks'])
+        meta['offset'] = min(contiguous * meta['chunk_size'], meta['total_size'])
+        return meta
+
+    def write_chunk(self, upload_id, index, stream, checksum=None):
+        """
+        写入一个分块（流式写入磁盘，先写临时文件，校验通过后再改名）
+
+        参数：
+            upload_id: str, 会话ID
+            index: int, 分块序号（从0开始）
+            stream: 可读取的二进制流
+            checksum: str, 该分块的SHA-256（可选）
+
+        返回：
+            dict: 更新后的会话状态；会话不存在时返回None
+        """
+        meta = self._load_meta(upload_id)
+        if meta is None:
+            return None
+
+        if not 0 <= index < meta['total_chunks']:
+            raise ValueError(f'分块序号超出范围: {index}')
+
+        expected_size = min(meta['chunk_size'], meta['total_size'] - index * meta['chunk_size'])
+        session_dir = self._session_dir(upload_id)
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=session_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while True:
+                    data = stream.read(COPY_BUFFER_SIZE)
+                    if not data:
+                        break
+                    size += len(data)
+                    if size > expected_size:
+                        raise ValueError(f'分块大小超出预期: {expected_size}字节')
+                    digest.update(data)
+                    f.write(data)
+
+            if size != expected_size:
+                raise ValueError(f'分块大小不正确: 收到{size}字节，应为{expected_size}字节')
+            if checksum and digest.hexdigest() != checksum.lower():
+                raise ValueError('分块校验和不匹配')
+
+            os.replace(tmp_path, self._chunk_path(upload_id, index))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return self.get_session(upload_id)
+
+    def finalize(self, upload_id):
+        """
+        合并所有分块为完整文件并校验
+
+        返回：
+            str: 合并后的文件路径；会话不存在时返回None
+        """
+        session = self.get_session(upload_id)
+        if session is None:
+            return None
+
+        if session['missing_count']:
+            raise ValueError(f"还有{session['missing_count']}个分块未上传")
+
+        filename = secure_filename(session['filename']) or 'upload'
+        final_path = os.path.join(self.upload_folder, f'{upload_id}_{filename}')
+
+        digest = hashlib.sha256()
+        with open(final_path, 'wb') as out:
+            for index in range(session['total_chunks']):
+                with open(self._chunk_path(upload_id, index), 'rb') as part:
+                    while True:
+                        data = part.read(COPY_BUFFER_SIZE)
+                        if not data:
+                            break
+                        digest.update(data)
+                        out.write(data)
+
+        if session['checksum'] and digest.hexdigest() != session['checksum']:
+            os.remove(final_path)
+            raise ValueError('文件校验和不匹配，请重新上传')
+
+        self.abort(upload_id)
+        return final_path
+
+    def abort(self, upload_id):
+        """删除上传会话及已上传的分块"""
+        if not UPLOAD_ID_RE.match(upload_id or ''):
+            return False
+        session_dir = self._session_dir(upload_id)
+        if not os.path.isdir(session_dir):
+            return False
+        shutil.rmtree(session_dir, ignore_errors=True)
+        return True
+
+    def cleanup_expired(self):
+        """清理超时未完成的上传会话"""
+        if not os.path.isdir(self.chunks_folder):
+            return
+
+        now = time.time()
+        for upload_id in os.listdir(self.chunks_folder):
+            session_dir = os.path.join(self.chunks_folder, upload_id)
+            try:
+                if now - os.path.getmtime(session_dir) > self.session_ttl:
+                    shutil.rmtree(session_dir, ignore_errors=True)
+            except FileNotFoundError:
+                continue
+
+    def _session_dir(self, upload_id):
+        return os.path.join(self.chunks_folder, upload_id)
+
+    def _chunk_path(self, upload_id, index):
+        return os.path.join(self._session_dir(upload_id), f'{index}.part')
+
+    def _load_meta(self, upload_id):
+        """读取会话信息，会话ID不合法或不存在时返回None"""
+        if not UPLOAD_ID_RE.match(upload_id or ''):
+            return None
+        try:
+            with open(os.path.join(self._session_dir(upload_id), 'meta.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _first_missing(received, total_chunks, limit=MISSING_CHUNKS_LIMIT):
+        """前 limit 个缺失的分块序号（只遍历到找够为止，不随文件大小增长）"""
+        missing = []
+        index = 0
+        while index < total_chunks and len(missing) < limit:
+            if index not in received:
+                missing.append(index)
+            index += 1
+        return missing
+
+    def _received_chunks(self, upload_id):
+        received = set()
+        for name in os.listdir(self._session_dir(upload_id)):
+            index, ext = os.path.splitext(name)
+            if ext == '.part' and index.isdigit():
+                received.add(int(index))
+        return received
@@ -0,0 +1,106 @@
+import atexit
+import threading
+import traceback
+
+
+class WriteBehindQueue:
+    """
+    延迟写入队列：把频繁的小更新（如收藏状态）按联系人合并，
+    到达时间间隔或数量上限时在一个事务中批量写入
+
+    待写入的数据在写入完成前仍对读取可见（见 overlay），
+    进程正常退出时会把剩余的数据写入数据库
+    """
+
+    def __init__(self, flush_fn, interval=0.5, batch_size=200):
+        """
+        参数：
+            flush_fn: callable(tenant_id, {contact_id: {字段: 值}}), 在一个事务中写入一个租户的更新
+            interval: float, 最长延迟时间（秒）
+            batch_size: int, 待写入的联系人数达到该值时立即写入
+        """
+        self.flush_fn = flush_fn
+        self.interval = interval
+        self.batch_size = batch_size
+
+        self._pending = {}  # {tenant_id: {contact_id: {字段: 值}}}
+        self._inflight = {}  # 正在写入、尚未提交的数据
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, tenant_id, contact_id, fields):
+        """加入一条更新，同一联系人的多次更新会合并（后写的覆盖先写的）"""
+        with self._lock:
+            updates = self._pending.setdefault(tenant_id, {})
+            updates.setdefault(contact_id, {}).update(fields)
+            pending_count = sum(len(items) for items in self._pending.values())
+
+        if pending_count >= self.batch_size:
+            self._wakeup.set()
+
+    def overlay(self, tenant_id, contact_id):
+        """获取某个联系人尚未写入数据库的字段，没有时返回None"""
+        with self._lock:
+            fields = {}
+            fields.update(self._inflight.get(tenant_id, {}).get(contact_id, {}))
+            fields.update(self._pending.get(tenant_id, {}).get(contact_id, {}))
+            return fields or None
+
+    def has_pending(self, tenant_id):
+        with self._lock:
+            return bool(self._pending.get(tenant_id) or self._inflight.get(tenant_id))
+
+    def flush(self, tenant_id=None, all_tenants=False):
+        """
+        立即写入待处理的更新
+
+        参数：
+            tenant_id: 只写入该租户的数据
+            all_tenants: 为True时写入所有租户的数据
+        """
+        with self._flush_lock:
+            with self._lock:
+                tenant_ids = list(self._pending) if all_tenants else [tenant_id]
+                batches = {}
+                for tid in tenant_ids:
+                    updates = self._pending.pop(tid, None)
+                    if updates:
+                        batches[tid] = updates
+                        self._inflight[tid] = updates
+
+            for tid, updates in batches.items():
+                try:
+                    self.flush_fn(tid, updates)
+                except Exception:
+                    # 写入失败时放回队列，较新的数据优先
+                    with self._lock:
+                        pending = self._pending.setdefault(tid, {})
+                        for contact_id, fields in updates.items():
+                            pending[contact_id] = {**fields, **pending.get(contact_id, {})}
+                    traceback.print_exc()
+                finally:
+                    with self._lock:
+                        self._inflight.pop(tid, None)
+
+    def close(self):
+        """停止后台线程并写入剩余数据"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.flush(all_tenants=True)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            self.flush(all_tenants=True)
@@ -457,11 +457,11 @@ async function uploadExcel() {
     }
 
     // 检查文件类型
-    const validExtensions = ['.xlsx', '.xls', '.csv'];
+    const validExtensions = ['.xlsx', '.csv', '.vcf', '.vcard', '.ndjson', '.jsonl'];
     const fileExtension = '.' + file.name.split('.').pop().toLowerCase();
 
     if (!validExtensions.includes(fileExtension)) {
-        showNotification('只支持 .xlsx, .xls, .csv 格式的文件', 'error');
+        showNotification('只支持 .xlsx, .csv, .vcf, .ndjson 格式的文件', 'error');
         return;
     }
 
@@ -0,0 +1,25 @@
+import unittest
+
+from utils.normalizer import normalize_phone
+
+
+class NormalizePhoneTest(unittest.TestCase):
+
+    def test_mobile_country_code_variants(self):
+        for value in ('+86 138-0013-8000', '0086 13800138000', '8613800138000', '13800138000'):
+            self.assertEqual(normalize_phone(value), '13800138000', value)
+
+    def test_landline_trunk_prefix(self):
+        for value in ('010-6255 1234', '+86 10 6255 1234', '0086 10 62551234', '+86 (0)10 6255 1234'):
+            self.assertEqual(normalize_phone(value), '01062551234', value)
+        self.assertEqual(normalize_phone('+86 755 8888 1234'), normalize_phone('0755-88881234'))
+
+    def test_non_geographic_numbers_keep_no_trunk_prefix(self):
+        self.assertEqual(normalize_phone('+86 400 123 4567'), '4001234567')
+
+    def test_other_country_codes_untouched(self):
+        self.assertEqual(normalize_phone('+1 555 123 4567'), '15551234567')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from app import create_app
+from config import config
+from database.models import db
+
+
+class TenantIsolationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        tmp = self.tmp
+
+        class TestConfig(config['development']):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'default.db')
+            UPLOAD_FOLDER = os.path.join(tmp, 'uploads')
+            EXPORT_CACHE_FOLDER = os.path.join(tmp, 'export_cache')
+            TENANT_FOLDER = os.path.join(tmp, 'tenants')
+            WRITE_BEHIND_ENABLED = False
+
+        config['test_tenants'] = TestConfig
+        self.app = create_app('test_tenants')
+        with self.app.app_context():
+            db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.app.extensions['tenants'].dispose_all()
+        with self.app.app_context():
+            db.engine.dispose()
+        config.pop('test_tenants', None)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def create(self, name, headers=None):
+        response = self.client.post('/api/contacts', json={'name': name}, headers=headers)
+        self.assertEqual(response.status_code, 201)
+
+    def names(self, path, headers=None):
+        return [contact['name'] for contact in self.client.get(path, headers=headers).get_json()['data']]
+
+    def export_names(self, path, headers=None):
+        response = self.client.get(path, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        names = [json.loads(line)['name'] for line in response.get_data(as_text=True).splitlines()]
+        return names, response.headers['ETag']
+
+    def test_list_is_isolated(self):
+        self.create('默认库联系人')
+        self.create('租户联系人', headers={'X-Tenant-ID': 'acme'})
+
+        self.assertEqual(self.names('/api/contacts'), ['默认库联系人'])
+        self.assertEqual(self.names('/api/contacts', headers={'X-Tenant-ID': 'acme'}), ['租户联系人'])
+        self.assertEqual(self.names('/t/acme/api/contacts'), ['租户联系人'])
+
+    def test_tenant_named_default_does_not_share_export_snapshot(self):
+        # 两个数据库的数据版本号相同，快照键和ETag仍然必须不同
+        self.create('默认库联系人')
+        default_names, default_etag = self.export_names('/api/contacts/export?format=ndjson')
+
+        self.create('租户联系人', headers={'X-Tenant-ID': 'default'})
+        tenant_names, tenant_etag = self.export_names('/api/contacts/export?format=ndjson',
+                                                      headers={'X-Tenant-ID': 'default'})
+
+        self.assertEqual(default_names, ['默认库联系人'])
+        self.assertEqual(tenant_names, ['租户联系人'])
+        self.assertNotEqual(default_etag, tenant_etag)
+        self.assertEqual(self.export_names('/t/default/api/contacts/export?format=ndjson')[0], ['租户联系人'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import io
+import unittest
+
+from utils.vcard_generator import VCardGenerator
+
+
+def parse(text):
+    return list(VCardGenerator.parse_lines(io.StringIO(text, newline='')))
+
+
+class VCardParserTest(unittest.TestCase):
+
+    def test_quoted_printable_soft_line_break(self):
+        cards = parse(
+            'BEGIN:VCARD\r\n'
+            'VERSION:2.1\r\n'
+            'FN;CHARSET=UTF-8;ENCODING=QUOTED-PRINTABLE:=E5=BC=A0=E4=B8=89=E4=B8=89=E4=B8=89=E4=B8=89=\r\n'
+            '=E4=B8=89=E4=B8=89=E4=B8=89\r\n'
+            'TEL;CELL:13800138000\r\n'
+            'END:VCARD\r\n'
+        )
+        self.assertEqual(len(cards), 1)
+        self.assertEqual(cards[0]['name'], '张三三三三三三三')
+        self.assertEqual(cards[0]['contact_methods'][0]['value'], '13800138000')
+
+    def test_bare_quoted_printable_param(self):
+        cards = parse(
+            'BEGIN:VCARD\r\n'
+            'VERSION:2.1\r\n'
+            'N;QUOTED-PRINTABLE;CHARSET=UTF-8:=E5=BC=A0;=E4=B8=89;;;\r\n'
+            'END:VCARD\r\n'
+        )
+        self.assertEqual(cards[0]['name'], '张三')
+
+    def test_folded_lines(self):
+        cards = parse(
+            'BEGIN:VCARD\r\n'
+            'VERSION:3.0\r\n'
+            'FN:张三\r\n'
+            'NOTE:第一行\\n第二\r\n'
+            ' 行\r\n'
+            '\tend\r\n'
+            'END:VCARD\r\n'
+        )
+        self.assertEqual(cards[0]['notes'], '第一行\n第二行end')
+
+    def test_quoted_param_value_with_comma(self):
+        cards = parse(
+            'BEGIN:VCARD\r\n'
+            'VERSION:3.0\r\n'
+            'FN:张三\r\n'
+            'TEL;X-LABEL="工作, 主要":13800138000\r\n'
+            'END:VCARD\r\n'
+        )
+        self.assertEqual(cards[0]['contact_methods'][0]['label'], '工作, 主要')
+
+    def test_quoted_type_list_is_split(self):
+        cards = parse(
+            'BEGIN:VCARD\r\n'
+            'VERSION:4.0\r\n'
+            'FN:张三\r\n'
+            'TEL;VALUE=uri;TYPE="cell,voice":tel:+86-138-0013-8000\r\n'
+            'EMAIL;TYPE=pref,work:z@example.com\r\n'
+            'END:VCARD\r\n'
+        )
+        self.assertEqual(cards[0]['contact_methods'], [
+            {'type': 'phone', 'value': '+86-138-0013-8000', 'label': 'cell'},
+            {'type': 'email', 'value': 'z@example.com', 'label': 'work'},
+        ])
+
+    def test_unknown_charset_falls_back_to_utf8(self):
+        cards = parse(
+            'BEGIN:VCARD\r\n'
+            'VERSION:2.1\r\n'
+            'FN;CHARSET=X-UNKNOWN;ENCODING=QUOTED-PRINTABLE:=E5=BC=A0=E4=B8=89\r\n'
+            'END:VCARD\r\n'
+        )
+        self.assertEqual(cards[0]['name'], '张三')
+
+    def test_bare_type_params(self):
+        cards = parse(
+            'BEGIN:VCARD\r\n'
+            'VERSION:2.1\r\n'
+            'N:Doe;John;;;\r\n'
+            'TEL;PREF;CELL:+1 555 1234\r\n'
+            'item1.EMAIL;TYPE=INTERNET,pref:j@example.org\r\n'
+            'END:VCARD\r\n'
+        )
+        contact = cards[0]
+        self.assertEqual(contact['name'], 'John Doe')
+        self.assertEqual(contact['contact_methods'], [
+            {'type': 'phone', 'value': '+1 555 1234', 'label': 'CELL'},
+            {'type': 'email', 'value': 'j@example.org', 'label': 'INTERNET'},
+        ])
+
+    def test_round_trip(self):
+        contact = {
+            'name': '张三;测试, 先生',
+            'notes': '第一行\n第二行，' + '很长' * 40,
+            'is_favorite': True,
+            'tags': ['同事', '朋友,老'],
+            'contact_methods': [
+                {'type': 'phone', 'value': '13800138000', 'label': '工作, 主要'},
+                {'type': 'email', 'value': 'a@example.com', 'label': '默认'},
+                {'type': 'address', 'value': '北京市海淀区;中关村', 'label': '家'},
+                {'type': 'social', 'value': '@wx', 'label': '微信'},
+            ]
+        }
+        for version in ('3.0', '4.0'):
+            buffer = io.BytesIO()
+            VCardGenerator.write_contacts([contact], buffer, version)
+            text = buffer.getvalue().decode('utf-8')
+
+            self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in text.split('\r\n')))
+            parsed = parse(text)[0]
+            for key in ('name', 'notes', 'is_favorite', 'tags', 'contact_methods'):
+                self.assertEqual(parsed[key], contact[key], (version, key))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,26 @@
 """
 import csv
 import io
-from datetime import datetime
+import posixpath
+import re
+import zipfile
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+# 导出文件的列顺序
+EXPORT_COLUMNS = ['姓名', '电话', '邮箱', '社交媒体', '地址', '备注', '是否收藏', '标签']
+
+
+# 读取.xlsx时用到的XML命名空间
+XLSX_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+RELS_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+DOC_RELS_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+CELL_REF_RE = re.compile(r'^([A-Z]+)')
+NUMBER_RE = re.compile(r'^-?\d+(\.\d+)?([eE][+-]?\d+)?$')
+
+ZIP_MAGIC = b'PK\x03\x04'
+OLE2_MAGIC = b'\xd0\xcf\x11\xe0'  # 旧版.xls（BIFF）文件头
 
 
 class ExcelGenerator:
@@ -14,298 +33,453 @@ class ExcelGenerator:
     """
 
     @staticmethod
-    def create_excel(data, sheet_name="通讯录"):
+    def create_xlsx(rows, columns, fileobj, sheet_name="通讯录"):
         """
-        创建Excel文件（实际上是包含CSV的ZIP，但扩展名是.xlsx）
+        生成真正的.xlsx文件（Office Open XML），直接写入文件对象
 
         参数：
-            data: list of dicts, 数据列表
+            rows: iterable of dicts, 数据行
+            columns: list, 列名（同时作为表头）
+            fileobj: 可写入的二进制文件对象
             sheet_name: str, 工作表名称
+        """
+        with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr('[Content_Types].xml', (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                '<Override PartName="/xl/workbook.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                '<Override PartName="/xl/worksheets/sheet1.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                '</Types>'
+            ))
+            zf.writestr('_rels/.rels', (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                '<Relationship Id="rId1" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+                'Target="xl/workbook.xml"/>'
+                '</Relationships>'
+            ))
+            zf.writestr('xl/workbook.xml', (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                f'<sheets><sheet name="{escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets>'
+                '</workbook>'
+            ))
+            zf.writestr('xl/_rels/workbook.xml.rels', (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                '<Relationship Id="rId1" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                'Target="worksheets/sheet1.xml"/>'
+                '</Relationships>'
+            ))
+
+            # 工作表逐行写入，避免在内存中拼出整个XML
+            with zf.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+                sheet.write((
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                    '<sheetData>'
+                ).encode('utf-8'))
+
+                sheet.write(ExcelGenerator._xlsx_row(columns).encode('utf-8'))
+                for row in rows:
+                    values = [row.get(col, '') for col in columns]
+                    sheet.write(ExcelGenerator._xlsx_row(values).encode('utf-8'))
+
+                sheet.write('</sheetData></worksheet>'.encode('utf-8'))
 
-        返回：
-            bytes: Excel文件内容
+    @staticmethod
+    def _xlsx_row(values):
+        """生成一行xlsx单元格（使用内联字符串）"""
+        cells = ''.join(
+            f'<c t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>'
+            for value in values
+        )
+        return f'<row>{cells}</row>'
+
+    @staticmethod
+    def contact_to_row(contact):
         """
-        # 如果数据为空，返回空文件
-        if not data:
-            return b''
+        把联系人数据转换成导出行
 
-        # 获取所有可能的列
-        all_columns = set()
-        for row in data:
-            all_columns.update(row.keys())
+        参数：
+            contact: dict, 联系人数据
 
-        columns = sorted(list(all_columns))
+        返回：
+            dict: 以EXPORT_COLUMNS为键的行数据
+        """
+        methods = {'phone': [], 'email': [], 'social': [], 'address': []}
+        for method in contact.get('contact_methods', []):
+            method_type = method.get('type', '')
+            if method_type in methods:
+                methods[method_type].append(method.get('value', ''))
+
+        return {
+            '姓名': contact.get('name', ''),
+            '电话': '; '.join(methods['phone']),
+            '邮箱': '; '.join(methods['email']),
+            '社交媒体': '; '.join(methods['social']),
+            '地址': '; '.join(methods['address']),
+            '备注': contact.get('notes', ''),
+            '是否收藏': '是' if contact.get('is_favorite', False) else '否',
+            '标签': '; '.join(contact.get('tags', []))
+        }
 
-        # 创建CSV内容
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=columns, quoting=csv.QUOTE_MINIMAL)
-        writer.writeheader()
+    @staticmethod
+    def write_contacts_csv(contacts, fileobj):
+        """
+        把联系人以CSV格式（带BOM的UTF-8）写入二进制文件对象
 
-        for row in data:
-            # 确保每行都有所有列
-            row_data = {col: row.get(col, '') for col in columns}
-            writer.writerow(row_data)
+        参数：
+            contacts: iterable, 联系人列表
+            fileobj: 可写入的二进制文件对象
+        """
+        text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+        try:
+            writer = csv.DictWriter(text, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+            for contact in contacts:
+                writer.writerow(ExcelGenerator.contact_to_row(contact))
+            text.flush()
+        finally:
+            # 不关闭底层文件对象
+            text.detach()
 
-        csv_content = output.getvalue()
+    @staticmethod
+    def write_contacts_xlsx(contacts, fileobj):
+        """
+        把联系人以xlsx格式写入二进制文件对象
 
-        return csv_content.encode('utf-8-sig')
+        参数：
+            contacts: iterable, 联系人列表
+            fileobj: 可写入的二进制文件对象
+        """
+        rows = (ExcelGenerator.contact_to_row(contact) for contact in contacts)
+        ExcelGenerator.create_xlsx(rows, EXPORT_COLUMNS, fileobj, "通讯录")
 
     @staticmethod
-    def create_excel_from_contacts(contacts):
+    def parse_excel_file(path):
         """
-        从联系人数据生成Excel格式
+        流式解析磁盘上的Excel/CSV文件，逐行读取，不把整个文件读入内存
+
+        按文件内容判断格式：.xlsx（zip）逐行解析工作表，其余按CSV文本解析；
+        旧版二进制.xls无法解析，抛出ValueError
 
         参数：
-            contacts: list, 联系人列表
+            path: str, 文件路径
 
         返回：
-            bytes: Excel文件内容
+            generator: 逐个产出联系人数据
         """
-        excel_data = []
-
-        for contact in contacts:
-            # 提取各种联系方式
-            phones = []
-            emails = []
-            socials = []
-            addresses = []
-
-            for method in contact.get('contact_methods', []):
-                method_type = method.get('type', '')
-                value = method.get('value', '')
-
-                if method_type == 'phone':
-                    phones.append(value)
-                elif method_type == 'email':
-                    emails.append(value)
-                elif method_type == 'social':
-                    socials.append(value)
-                elif method_type == 'address':
-                    addresses.append(value)
-
-            row_data = {
-                '姓名': contact.get('name', ''),
-                '电话': '; '.join(phones),
-                '邮箱': '; '.join(emails),
-                '社交媒体': '; '.join(socials),
-                '地址': '; '.join(addresses),
-                '备注': contact.get('notes', ''),
-                '是否收藏': '是' if contact.get('is_favorite', False) else '否'
-            }
+        with open(path, 'rb') as f:
+            magic = f.read(4)
 
-            excel_data.append(row_data)
+        if magic == ZIP_MAGIC:
+            yield from ExcelGenerator._iter_xlsx_contacts(path)
+            return
+        if magic == OLE2_MAGIC:
+            raise ValueError('不支持旧版.xls格式，请另存为.xlsx或CSV后再导入')
 
-        return ExcelGenerator.create_excel(excel_data, "通讯录")
+        with open(path, encoding='utf-8-sig', errors='ignore', newline='') as f:
+            yield from ExcelGenerator._iter_csv_contacts(enumerate(f, 1))
 
     @staticmethod
-    def parse_excel_to_contacts(excel_content):
+    def _iter_csv_contacts(numbered_lines):
         """
-        解析Excel/CSV文件内容为联系人数据
+        逐行解析CSV，第一行非空行是表头
 
         参数：
-            excel_content: bytes, 文件内容
+            numbered_lines: iterable of (行号, 行内容)
 
         返回：
-            list: 联系人数据列表
+            generator: 逐个产出联系人数据
         """
-        # 解码内容
-        try:
-            content = excel_content.decode('utf-8-sig')
-        except:
-            content = excel_content.decode('utf-8', errors='ignore')
+        rows = ((line_number, next(csv.reader([line.strip()]), []))
+                for line_number, line in numbered_lines
+                if line.strip())
+        yield from ExcelGenerator._iter_row_contacts(rows)
+
+    @staticmethod
+    def _iter_xlsx_contacts(file):
+        """
+        逐行解析.xlsx的第一个工作表，第一行非空行是表头
 
-        # 清理BOM字符
-        content = content.strip('\ufeff')
+        参数：
+            file: str 或二进制文件对象
+
+        返回：
+            generator: 逐个产出联系人数据
+        """
+        try:
+            zf = zipfile.ZipFile(file)
+        except zipfile.BadZipFile:
+            raise ValueError('Excel文件已损坏，无法解析')
 
-        # 使用简单可靠的解析方法
-        return ExcelGenerator._parse_csv_simple(content)
+        with zf:
+            rows = ((row_number, values)
+                    for row_number, values in ExcelGenerator._iter_xlsx_rows(zf)
+                    if any(value.strip() for value in values))
+            yield from ExcelGenerator._iter_row_contacts(rows)
 
     @staticmethod
-    def _parse_csv_simple(content):
-        """简单可靠的CSV解析方法"""
-        contacts = []
+    def _iter_xlsx_rows(zf):
+        """
+        用iterparse逐行读取工作表，已处理的行立即释放
 
-        try:
-            # 按行分割
-            lines = [line.strip() for line in content.splitlines() if line.strip()]
-
-            if len(lines) < 2:
-                return contacts
-
-            # 第一行是表头
-            header_line = lines[0]
-            # 解析表头
-            headers = []
-            reader = csv.reader([header_line])
-            for row in reader:
-                headers = row
-                break
-
-            print(f"表头: {headers}")
-
-            # 解析数据行
-            for i in range(1, len(lines)):
-                line = lines[i]
-                if not line.strip():
+        返回：
+            generator: 逐行产出 (行号, 单元格值列表)
+        """
+        shared_strings = ExcelGenerator._read_shared_strings(zf)
+        sheet_path = ExcelGenerator._first_sheet_path(zf)
+        if sheet_path not in zf.namelist():
+            raise ValueError('Excel文件中没有工作表')
+
+        sheet_data = None
+        row_number = 0
+        with zf.open(sheet_path) as sheet:
+            for event, elem in ElementTree.iterparse(sheet, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag == XLSX_NS + 'sheetData':
+                        sheet_data = elem
+                    continue
+                if elem.tag != XLSX_NS + 'row':
                     continue
 
-                # 解析这一行
+                row_number = int(elem.get('r') or row_number + 1)
                 values = []
-                reader = csv.reader([line])
-                for row in reader:
-                    values = row
-                    break
+                for cell in elem.iter(XLSX_NS + 'c'):
+                    match = CELL_REF_RE.match(cell.get('r') or '')
+                    if match:
+                        # 稀疏行：空单元格不会出现在XML中，按列号补齐
+                        column = ExcelGenerator._column_index(match.group(1))
+                        values.extend([''] * (column - len(values)))
+                    values.append(ExcelGenerator._cell_value(cell, shared_strings))
+
+                yield row_number, values
+                elem.clear()
+                if sheet_data is not None:
+                    sheet_data.clear()
 
-                # 确保values长度与headers一致
-                while len(values) < len(headers):
-                    values.append('')
+    @staticmethod
+    def _read_shared_strings(zf):
+        """读取共享字符串表（单元格中 t="s" 的值是该表的序号）"""
+        if 'xl/sharedStrings.xml' not in zf.namelist():
+            return []
+
+        strings = []
+        with zf.open('xl/sharedStrings.xml') as f:
+            for _, elem in ElementTree.iterparse(f):
+                if elem.tag == XLSX_NS + 'si':
+                    strings.append(ExcelGenerator._rich_text(elem))
+                    elem.clear()
+        return strings
 
-                # 创建行字典
-                row_dict = {}
-                for j, header in enumerate(headers):
-                    if j < len(values):
-                        row_dict[header.strip()] = values[j].strip()
-                    else:
-                        row_dict[header.strip()] = ''
+    @staticmethod
+    def _first_sheet_path(zf):
+        """根据workbook.xml和关系文件找到第一个工作表，找不到时使用默认路径"""
+        try:
+            workbook = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+            sheet = workbook.find(f'{XLSX_NS}sheets/{XLSX_NS}sheet')
+            rel_id = sheet.get(DOC_RELS_NS + 'id')
+            rels = ElementTree.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+            for rel in rels.iter(RELS_NS + 'Relationship'):
+                if rel.get('Id') == rel_id:
+                    target = rel.get('Target')
+                    if target.startswith('/'):
+                        return target.lstrip('/')
+                    return posixpath.normpath(posixpath.join('xl', target))
+        except (KeyError, AttributeError, ElementTree.ParseError):
+            pass
+        return 'xl/worksheets/sheet1.xml'
 
-                print(f"行 {i} 数据: {row_dict}")
+    @staticmethod
+    def _cell_value(cell, shared_strings):
+        """读取单元格的文本值"""
+        cell_type = cell.get('t')
+        if cell_type == 'inlineStr':
+            inline = cell.find(XLSX_NS + 'is')
+            return ExcelGenerator._rich_text(inline) if inline is not None else ''
+
+        value = cell.findtext(XLSX_NS + 'v') or ''
+        if cell_type == 's':
+            try:
+                return shared_strings[int(value)]
+            except (ValueError, IndexError):
+                return ''
+        if cell_type in (None, 'n') and NUMBER_RE.match(value):
+            # 电话号码常被Excel存成数字（如 1.38001380000E10），还原成整数文本
+            number = float(value)
+            if number.is_integer() and abs(number) < 1e16:
+                return str(int(number))
+        return value
 
-                # 提取姓名（支持多种列名）
-                name = None
-                name_keys = ['姓名', '名字', 'Name', 'name', '联系人']
+    @staticmethod
+    def _rich_text(elem):
+        """拼接字符串节点中的文本（忽略拼音注音 rPh）"""
+        parts = []
+        for child in elem:
+            if child.tag == XLSX_NS + 't':
+                parts.append(child.text or '')
+            elif child.tag == XLSX_NS + 'r':
+                parts.append(child.findtext(XLSX_NS + 't') or '')
+        return ''.join(parts)
 
-                for key in name_keys:
-                    if key in row_dict and row_dict[key]:
-                        name = row_dict[key]
-                        break
+    @staticmethod
+    def _column_index(letters):
+        """列字母转换为从0开始的序号，如 A -> 0, AB -> 27"""
+        index = 0
+        for letter in letters:
+            index = index * 26 + ord(letter) - ord('A') + 1
+        return index - 1
 
-                # 如果没有找到标准姓名列，使用第一个非空列
-                if not name:
-                    for key, value in row_dict.items():
-                        if value:
-                            name = value
-                            break
+    @staticmethod
+    def _iter_row_contacts(numbered_rows):
+        """
+        把表格行转换成联系人数据，第一行是表头
 
-                if not name:
-                    continue
+        参数：
+            numbered_rows: iterable of (行号, 单元格值列表)，不含空行
 
-                # 构建联系人数据
-                contact_data = {
-                    'name': name,
-                    'notes': '',
-                    'is_favorite': False,
-                    'contact_methods': []
-                }
-
-                # 处理备注
-                note_keys = ['备注', 'Notes', 'notes', '说明']
-                for key in note_keys:
-                    if key in row_dict:
-                        contact_data['notes'] = row_dict[key]
-                        break
+        返回：
+            generator: 逐个产出联系人数据
+        """
+        headers = None
 
-                # 处理是否收藏
-                favorite_keys = ['是否收藏', '收藏', 'favorite', 'Favorite']
-                for key in favorite_keys:
-                    if key in row_dict:
-                        value = row_dict[key].lower()
-                        contact_data['is_favorite'] = value in ['是', 'yes', 'true', '1']
-                        break
+        for line_number, values in numbered_rows:
+            values = [str(value) for value in values]
 
-                # 处理电话
-                phone_keys = ['电话', 'Phone', 'phone', '手机']
-                for key in phone_keys:
-                    if key in row_dict and row_dict[key]:
-                        phones = row_dict[key]
-                        # 分割多个电话
-                        for phone in phones.replace(';', ',').split(','):
-                            phone = phone.strip()
-                            if phone:
-                                contact_data['contact_methods'].append({
-                                    'type': 'phone',
-                                    'value': phone,
-                                    'label': '默认'
-                                })
-                        break
+            if headers is None:
+                headers = values
+                print(f"表头: {headers}")
+                continue
 
-                # 处理邮箱
-                email_keys = ['邮箱', 'Email', 'email', '邮件']
-                for key in email_keys:
-                    if key in row_dict and row_dict[key]:
-                        emails = row_dict[key]
-                        for email in emails.replace(';', ',').split(','):
-                            email = email.strip()
-                            if email:
-                                contact_data['contact_methods'].append({
-                                    'type': 'email',
-                                    'value': email,
-                                    'label': '默认'
-                                })
-                        break
+            # 确保values长度与headers一致
+            while len(values) < len(headers):
+                values.append('')
 
-                # 处理社交媒体
-                social_keys = ['社交媒体', 'Social', 'social', '微信', '微博']
-                for key in social_keys:
-                    if key in row_dict and row_dict[key]:
-                        socials = row_dict[key]
-                        for social in socials.replace(';', ',').split(','):
-                            social = social.strip()
-                            if social:
-                                contact_data['contact_methods'].append({
-                                    'type': 'social',
-                                    'value': social,
-                                    'label': '默认'
-                                })
-                        break
+            # 创建行字典
+            row_dict = {}
+            for j, header in enumerate(headers):
+                row_dict[header.strip()] = values[j].strip()
+
+            # 提取姓名（支持多种列名）
+            name = None
+            name_keys = ['姓名', '名字', 'Name', 'name', '联系人']
 
-                # 处理地址
-                address_keys = ['地址', 'Address', 'address', '住址']
-                for key in address_keys:
-                    if key in row_dict and row_dict[key]:
-                        addresses = row_dict[key]
-                        for address in addresses.replace(';', ',').split(','):
-                            address = address.strip()
-                            if address:
-                                contact_data['contact_methods'].append({
-                                    'type': 'address',
-                                    'value': address,
-                                    'label': '默认'
-                                })
+            for key in name_keys:
+                if key in row_dict and row_dict[key]:
+                    name = row_dict[key]
+                    break
+
+            # 如果没有找到标准姓名列，使用第一个非空列
+            if not name:
+                for key, value in row_dict.items():
+                    if value:
+                        name = value
                         break
 
-                contacts.append(contact_data)
-                print(f"成功解析联系人: {contact_data['name']}")
+            if not name:
+                continue
+
+            # 构建联系人数据
+            contact_data = {
+                'line_number': line_number,
+                'name': name,
+                'notes': '',
+                'is_favorite': False,
+                'tags': [],
+                'contact_methods': []
+            }
 
-        except Exception as e:
-            print(f"CSV解析错误: {e}")
-            import traceback
-            traceback.print_exc()
+            # 处理备注
+            note_keys = ['备注', 'Notes', 'notes', '说明']
+            for key in note_keys:
+                if key in row_dict:
+                    contact_data['notes'] = row_dict[key]
+                    break
 
-        print(f"总共解析了 {len(contacts)} 个联系人")
-        return contacts
+            # 处理是否收藏
+            favorite_keys = ['是否收藏', '收藏', 'favorite', 'Favorite']
+            for key in favorite_keys:
+                if key in row_dict:
+                    value = row_dict[key].lower()
+                    contact_data['is_favorite'] = value in ['是', 'yes', 'true', '1']
+                    break
 
-    @staticmethod
-    def create_template():
-        """创建导入模板"""
-        data = [
-            {
-                '姓名': '张三',
-                '电话': '13800138000; 13900139000',
-                '邮箱': 'zhangsan@example.com',
-                '社交媒体': '@zhangsan',
-                '地址': '北京市海淀区',
-                '备注': '同事',
-                '是否收藏': '是'
-            },
-            {
-                '姓名': '李四',
-                '电话': '13600136000',
-                '邮箱': 'lisi@example.com',
-                '社交媒体': '',
-                '地址': '上海市浦东新区',
-                '备注': '朋友',
-                '是否收藏': '否'
-            }
-        ]
+            # 处理标签/分组
+            tag_keys = ['标签', '分组', 'Tags', 'tags']
+            for key in tag_keys:
+                if key in row_dict and row_dict[key]:
+                    contact_data['tags'] = [tag.strip()
+                                            for tag in row_dict[key].replace(';', ',').split(',')
+                                            if tag.strip()]
+                    break
+
+            # 处理电话
+            phone_keys = ['电话', 'Phone', 'phone', '手机']
+            for key in phone_keys:
+                if key in row_dict and row_dict[key]:
+                    phones = row_dict[key]
+                    # 分割多个电话
+                    for phone in phones.replace(';', ',').split(','):
+                        phone = phone.strip()
+                        if phone:
+                            contact_data['contact_methods'].append({
+                                'type': 'phone',
+                                'value': phone,
+                                'label': '默认'
+                            })
+                    break
+
+            # 处理邮箱
+            email_keys = ['邮箱', 'Email', 'email', '邮件']
+            for key in email_keys:
+                if key in row_dict and row_dict[key]:
+                    emails = row_dict[key]
+                    for email in emails.replace(';', ',').split(','):
+                        email = email.strip()
+                        if email:
+                            contact_data['contact_methods'].append({
+                                'type': 'email',
+                                'value': email,
+                                'label': '默认'
+                            })
+                    break
+
+            # 处理社交媒体
+            social_keys = ['社交媒体', 'Social', 'social', '微信', '微博']
+            for key in social_keys:
+                if key in row_dict and row_dict[key]:
+                    socials = row_dict[key]
+                    for social in socials.replace(';', ',').split(','):
+                        social = social.strip()
+                        if social:
+                            contact_data['contact_methods'].append({
+                                'type': 'social',
+                                'value': social,
+                                'label': '默认'
+                            })
+                    break
+
+            # 处理地址
+            address_keys = ['地址', 'Address', 'address', '住址']
+            for key in address_keys:
+                if key in row_dict and row_dict[key]:
+                    addresses = row_dict[key]
+                    for address in addresses.replace(';', ',').split(','):
+                        address = address.strip()
+                        if address:
+                            contact_data['contact_methods'].append({
+                                'type': 'address',
+                                'value': address,
+                                'label': '默认'
+                            })
+                    break
 
-        return ExcelGenerator.create_excel(data, "通讯录模板")
\ No newline at end of file
+            yield contact_data
@@ -0,0 +1,119 @@
+"""
+导出文件快照缓存
+数据没有变化时直接复用上次生成的导出文件，按大小和时间淘汰旧快照
+"""
+import os
+import re
+import tempfile
+import threading
+import time
+
+_UNSAFE_CHARS_RE = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+class ExportCache:
+    """
+    把生成好的导出文件保存在缓存目录中
+
+    文件名由格式和数据版本号等组成，数据版本号变化后自然生成新快照；
+    快照的mtime保持为生成时间（保证ETag/Last-Modified稳定，支持断点续传），
+    最近访问时间记录在atime上，淘汰时按最近访问时间计算
+    """
+
+    def __init__(self, folder, max_bytes=512 * 1024 * 1024, max_age=24 * 3600):
+        """
+        参数：
+            folder: str, 缓存目录
+            max_bytes: int, 缓存目录总大小上限（字节）
+            max_age: int, 快照最长保留时间（秒），以最近一次访问计算
+        """
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def snapshot_path(self, *key_parts, ext='csv'):
+        """根据缓存键生成快照文件路径"""
+        name = '_'.join(_UNSAFE_CHARS_RE.sub('-', str(part)) for part in key_parts)
+        return os.path.join(self.folder, f'{name}.{ext}')
+
+    def get_or_create(self, path, builder):
+        """
+        获取快照文件，不存在时调用builder生成
+
+        参数：
+            path: str, 快照路径（由snapshot_path生成）
+            builder: callable(fileobj), 把导出内容写入二进制文件对象
+
+        返回：
+            str: 快照文件路径
+        """
+        if os.path.exists(path):
+            self._touch(path)
+            return path
+
+        os.makedirs(self.folder, exist_ok=True)
+
+        # 先写临时文件再原子替换，其他进程不会读到写了一半的文件
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                builder(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        """
+        淘汰过期快照，并在总大小超过上限时从最久未访问的开始删除
+
+        参数：
+            keep: str, 不删除的文件路径（刚生成的快照）
+        """
+        with self._lock:
+            now = time.time()
+            entries = []
+            for name in os.listdir(self.folder):
+                path = os.path.join(self.folder, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+                last_used = max(stat.st_atime, stat.st_mtime)
+                # 临时文件也按年龄清理（进程异常退出时遗留）
+                if now - last_used > self.max_age and path != keep:
+                    self._remove(path)
+                    continue
+                if not name.endswith('.tmp'):
+                    entries.append((last_used, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for last_used, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _touch(path):
+        """只更新访问时间，保持mtime不变"""
+        try:
+            stat = os.stat(path)
+            os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
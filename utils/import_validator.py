@@ -0,0 +1,176 @@
+"""
+导入数据校验与规范化
+解析出的联系人先经过校验（可在进程池中按块并行），只有合格的数据才会写入数据库
+"""
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from utils.normalizer import normalize_phone
+
+METHOD_TYPES = ('phone', 'email', 'social', 'address')
+DEFAULT_LABEL = '默认'
+
+# 与数据库字段长度保持一致
+MAX_NAME_LENGTH = 100
+MAX_VALUE_LENGTH = 200
+MAX_LABEL_LENGTH = 50
+MAX_TAG_LENGTH = 50
+
+PHONE_CHARS_RE = re.compile(r'^\+?[\d\s\-().]+$')
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# 校验进程池在第一次需要时创建，之后所有导入共用（按进程数区分）
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def validate_contact(contact_data):
+    """
+    校验并规范化单个联系人
+
+    参数：
+        contact_data: dict, 解析出的联系人数据
+
+    返回：
+        tuple: (规范化后的联系人, None) 或 (None, 错误信息)
+    """
+    if contact_data.get('parse_error'):
+        return None, contact_data['parse_error']
+
+    name = str(contact_data.get('name') or '').strip()
+    if not name:
+        return None, '姓名不能为空'
+    if len(name) > MAX_NAME_LENGTH:
+        return None, f'姓名超过{MAX_NAME_LENGTH}个字符'
+
+    methods = []
+    for method in contact_data.get('contact_methods', []):
+        method_type = method.get('type')
+        value = str(method.get('value') or '').strip()
+        label = str(method.get('label') or '').strip() or DEFAULT_LABEL
+
+        if method_type not in METHOD_TYPES:
+            return None, f'未知的联系方式类型: {method_type}'
+        if not value:
+            continue
+        if len(value) > MAX_VALUE_LENGTH:
+            return None, f'联系方式超过{MAX_VALUE_LENGTH}个字符: {value[:20]}...'
+
+        if method_type == 'phone':
+            digits = normalize_phone(value)
+            if not PHONE_CHARS_RE.match(value) or not 5 <= len(digits) <= 15:
+                return None, f'电话格式不正确: {value}'
+        elif method_type == 'email':
+            if not EMAIL_RE.match(value):
+                return None, f'邮箱格式不正确: {value}'
+
+        methods.append({
+            'type': method_type,
+            'value': value,
+            'label': label[:MAX_LABEL_LENGTH]
+        })
+
+    tags = []
+    for tag in contact_data.get('tags', []):
+        tag = str(tag).strip()
+        if not tag:
+            continue
+        if len(tag) > MAX_TAG_LENGTH:
+            return None, f'标签超过{MAX_TAG_LENGTH}个字符: {tag[:20]}...'
+        if tag not in tags:
+            tags.append(tag)
+
+    clean = dict(contact_data)
+    clean.update({
+        'name': name,
+        'notes': str(contact_data.get('notes') or '').strip(),
+        'is_favorite': bool(contact_data.get('is_favorite', False)),
+        'tags': tags,
+        'contact_methods': methods
+    })
+    return clean, None
+
+
+def validate_chunk(chunk):
+    """
+    校验一块联系人数据（进程池任务，必须是模块级函数）
+
+    返回：
+        tuple: (合格的联系人列表, 错误记录列表)
+    """
+    clean_rows = []
+    errors = []
+    for contact_data in chunk:
+        clean, error = validate_contact(contact_data)
+        if error:
+            errors.append({
+                '行号': contact_data.get('line_number'),
+                '姓名': contact_data.get('name', ''),
+                '错误': error
+            })
+        else:
+            clean_rows.append(clean)
+    return clean_rows, errors
+
+
+def iter_validated_chunks(contacts, workers=None, chunk_size=5000):
+    """
+    分块校验联系人数据，按原始顺序逐块返回结果
+
+    数据不足一块时直接在当前进程校验，否则交给进程池并行处理；
+    同时最多只有 workers*2 块在处理中，内存占用与文件大小无关
+
+    参数：
+        contacts: iterable, 解析出的联系人（可以是生成器）
+        workers: int, 进程数，默认等于CPU核数
+        chunk_size: int, 每块的联系人数量
+
+    返回：
+        generator: 每次产出 (合格的联系人列表, 错误记录列表)
+    """
+    iterator = iter(contacts)
+    first_chunk = list(islice(iterator, chunk_size))
+    workers = workers or os.cpu_count() or 1
+
+    # 数据量小或只允许单进程时，不值得启动进程池
+    if len(first_chunk) < chunk_size or workers <= 1:
+        yield validate_chunk(first_chunk)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield validate_chunk(chunk)
+
+    executor = _get_executor(workers)
+    pending = [executor.submit(validate_chunk, first_chunk)]
+    try:
+        while pending:
+            while len(pending) < workers * 2:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                pending.append(executor.submit(validate_chunk, chunk))
+            yield pending.pop(0).result()
+    finally:
+        # 提前结束（如导入出错）时取消还没开始的任务
+        for future in pending:
+            future.cancel()
+
+
+def _get_executor(workers):
+    """
+    获取共用的校验进程池
+
+    Web服务器是多线程的（还有延迟写入线程和数据库连接池），在这种进程里fork可能死锁，
+    因此用forkserver（不支持时用spawn）启动子进程
+    """
+    with _executor_lock:
+        if workers not in _executors:
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _executors[workers] = ProcessPoolExecutor(max_workers=workers,
+                                                      mp_context=multiprocessing.get_context(start_method))
+        return _executors[workers]
@@ -0,0 +1,104 @@
+"""
+JSON Lines（.ndjson/.jsonl）导入导出：每行一个联系人JSON对象
+导出和解析都是生成器，逐行处理，内存占用与联系人数量无关
+"""
+import json
+
+# 导出的字段，与 Contact.to_dict 一致
+EXPORT_FIELDS = ('id', 'name', 'notes', 'is_favorite', 'tags', 'contact_methods',
+                 'created_at', 'updated_at')
+
+
+class JsonLinesGenerator:
+    """JSON Lines导入导出"""
+
+    @staticmethod
+    def iter_lines(contacts):
+        """
+        逐个生成联系人的JSON行
+
+        参数：
+            contacts: iterable, 联系人数据（to_dict格式）
+
+        返回：
+            generator: 每次产出一行（以换行结尾）
+        """
+        for contact in contacts:
+            record = {field: contact.get(field) for field in EXPORT_FIELDS if field in contact}
+            record['contact_methods'] = [
+                {'type': method.get('type'), 'value': method.get('value'), 'label': method.get('label')}
+                for method in contact.get('contact_methods', [])
+            ]
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+
+    @staticmethod
+    def write_contacts(contacts, fileobj):
+        """
+        把联系人以JSON Lines格式写入二进制文件对象
+
+        参数：
+            contacts: iterable, 联系人列表
+            fileobj: 可写入的二进制文件对象
+        """
+        for line in JsonLinesGenerator.iter_lines(contacts):
+            fileobj.write(line.encode('utf-8'))
+
+    @staticmethod
+    def parse_file(path):
+        """
+        流式解析JSON Lines文件
+
+        参数：
+            path: str, 文件路径
+
+        返回：
+            generator: 逐个产出联系人数据；无法解析的行带有 parse_error，由校验环节记为错误
+        """
+        with open(path, encoding='utf-8-sig', errors='ignore') as f:
+            yield from JsonLinesGenerator.parse_lines(f)
+
+    @staticmethod
+    def parse_lines(lines):
+        """
+        解析JSON Lines文本行
+
+        参数：
+            lines: iterable of str, 文本行
+
+        返回：
+            generator: 逐个产出联系人数据
+        """
+        for line_number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield {'line_number': line_number, 'name': '', 'parse_error': f'JSON格式错误: {e.msg}'}
+                continue
+            if not isinstance(record, dict):
+                yield {'line_number': line_number, 'name': '', 'parse_error': '每行必须是一个JSON对象'}
+                continue
+
+            tags = record.get('tags') or []
+            if isinstance(tags, str):
+                tags = tags.replace('，', ',').split(',')
+
+            methods = record.get('contact_methods') or []
+            if not isinstance(methods, list):
+                methods = []
+
+            yield {
+                'line_number': line_number,
+                'name': record.get('name') or '',
+                'notes': record.get('notes') or '',
+                'is_favorite': record.get('is_favorite') in (True, 1, 'true', '是'),
+                'tags': [tag for tag in tags if isinstance(tag, str)],
+                'contact_methods': [
+                    {'type': method.get('type'), 'value': method.get('value'),
+                     'label': method.get('label') or '默认'}
+                    for method in methods if isinstance(method, dict)
+                ]
+            }
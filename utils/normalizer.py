@@ -0,0 +1,97 @@
+"""
+联系方式规范化工具
+用于反查索引：把各种格式的电话/邮箱统一成可精确匹配的形式
+"""
+import re
+
+# 默认国家代码（中国）
+DEFAULT_COUNTRY_CODE = '86'
+# 国内长途前缀：固话在国内拨打时带"0"（010-6255 1234），国际格式中省略（+86 10 6255 1234）
+TRUNK_PREFIX = '0'
+
+_NON_DIGIT_RE = re.compile(r'\D')
+_MOBILE_RE = re.compile(r'^1[3-9]\d{9}$')
+# 400/800 客服号码在国内也不带长途前缀
+_NON_GEOGRAPHIC_PREFIXES = ('400', '800')
+
+
+def normalize_phone(value, country_code=DEFAULT_COUNTRY_CODE):
+    """
+    规范化电话号码
+
+    去掉空格、横线、括号等格式字符，并去掉国际前缀和本国国家代码，
+    例如 "+86 138-0013-8000"、"0086 13800138000"、"8613800138000"
+    都会规范化为 "13800138000"；固话统一为带长途前缀"0"的国内格式，
+    例如 "+86 10 6255 1234" 和 "010-6255 1234" 都规范化为 "01062551234"
+
+    参数：
+        value: str, 原始电话号码
+        country_code: str, 本国国家代码
+
+    返回：
+        str: 规范化后的号码，无法识别时返回空字符串
+    """
+    if not value:
+        return ''
+
+    value = str(value).strip()
+    has_plus = value.startswith('+')
+    digits = _NON_DIGIT_RE.sub('', value)
+
+    # 国际前缀：+xx 或 00xx
+    international = has_plus
+    if not has_plus and digits.startswith('00'):
+        digits = digits[2:]
+        international = True
+
+    if country_code and digits.startswith(country_code):
+        rest = digits[len(country_code):]
+        # 带国际前缀时去掉国家代码（固话补上长途前缀"0"）；
+        # 不带前缀时只在剩余部分是11位手机号时去掉，避免误伤普通号码
+        if international:
+            digits = _add_trunk_prefix(rest) if country_code == DEFAULT_COUNTRY_CODE else rest
+        elif _MOBILE_RE.match(rest):
+            digits = rest
+
+    return digits
+
+
+def _add_trunk_prefix(national):
+    """国际格式的国内号码转换成国内拨号格式：固话补上长途前缀，手机号和400/800号码不变"""
+    if (_MOBILE_RE.match(national) or national.startswith(TRUNK_PREFIX)
+            or national.startswith(_NON_GEOGRAPHIC_PREFIXES) or not 9 <= len(national) <= 11):
+        return national
+    return TRUNK_PREFIX + national
+
+
+def normalize_email(value):
+    """
+    规范化邮箱地址（去掉首尾空白并转小写）
+
+    参数：
+        value: str, 原始邮箱
+
+    返回：
+        str: 规范化后的邮箱
+    """
+    if not value:
+        return ''
+    return str(value).strip().lower()
+
+
+def normalize_method_value(method_type, value):
+    """
+    按联系方式类型规范化
+
+    参数：
+        method_type: str, phone / email / ...
+        value: str, 原始值
+
+    返回：
+        str or None: 规范化后的值，不支持反查的类型返回None
+    """
+    if method_type == 'phone':
+        return normalize_phone(value) or None
+    if method_type == 'email':
+        return normalize_email(value) or None
+    return None
@@ -0,0 +1,354 @@
+"""
+vCard（.vcf）导入导出，支持3.0和4.0
+导出和解析都是生成器，逐个联系人处理，内存占用与联系人数量无关
+"""
+import io
+import quopri
+
+# 联系方式类型 -> vCard属性
+METHOD_PROPERTIES = {
+    'phone': 'TEL',
+    'email': 'EMAIL',
+    'address': 'ADR',
+    'social': 'X-SOCIALPROFILE',
+}
+PROPERTY_METHODS = {prop: method_type for method_type, prop in METHOD_PROPERTIES.items()}
+PROPERTY_METHODS['IMPP'] = 'social'
+
+DEFAULT_LABEL = '默认'
+# 不作为标签的TYPE值：vCard 2.1 中以无名参数出现的编码，以及表示首选项的pref
+NON_LABEL_TYPES = ('QUOTED-PRINTABLE', 'BASE64', '8BIT', '7BIT', 'PREF')
+# 值为自由文本的参数，引号内的逗号不拆分
+FREE_TEXT_PARAMS = ('X-LABEL',)
+MAX_LINE_OCTETS = 75
+
+
+class VCardGenerator:
+    """vCard导入导出"""
+
+    @staticmethod
+    def iter_vcards(contacts, version='3.0'):
+        """
+        逐个生成联系人的vCard文本
+
+        参数：
+            contacts: iterable, 联系人数据（to_dict格式）
+            version: str, '3.0' 或 '4.0'
+
+        返回：
+            generator: 每次产出一个联系人的vCard（CRLF换行）
+        """
+        for contact in contacts:
+            name = contact.get('name', '')
+            lines = [
+                'BEGIN:VCARD',
+                f'VERSION:{version}',
+                f'FN:{VCardGenerator._escape(name)}',
+                f'N:{VCardGenerator._escape(name)};;;;',
+            ]
+
+            for method in contact.get('contact_methods', []):
+                prop = METHOD_PROPERTIES.get(method.get('type'))
+                if not prop:
+                    continue
+
+                value = method.get('value', '')
+                params = ''
+                label = method.get('label')
+                if label and label != DEFAULT_LABEL:
+                    params += f';X-LABEL={VCardGenerator._param_value(label)}'
+
+                if prop == 'ADR':
+                    # 地址整体放在"街道"字段
+                    value = f';;{VCardGenerator._escape(value)};;;;'
+                elif prop == 'TEL' and version == '4.0':
+                    params += ';VALUE=text'
+                elif prop == 'X-SOCIALPROFILE':
+                    value = VCardGenerator._escape(value)
+
+                lines.append(f'{prop}{params}:{value}')
+
+            if contact.get('notes'):
+                lines.append(f"NOTE:{VCardGenerator._escape(contact['notes'])}")
+            if contact.get('tags'):
+                lines.append('CATEGORIES:' + ','.join(VCardGenerator._escape(tag) for tag in contact['tags']))
+            if contact.get('is_favorite'):
+                lines.append('X-FAVORITE:TRUE')
+            lines.append('END:VCARD')
+
+            yield ''.join(VCardGenerator._fold(line) + '\r\n' for line in lines)
+
+    @staticmethod
+    def write_contacts(contacts, fileobj, version='3.0'):
+        """
+        把联系人以vCard格式写入二进制文件对象
+
+        参数：
+            contacts: iterable, 联系人列表
+            fileobj: 可写入的二进制文件对象
+            version: str, '3.0' 或 '4.0'
+        """
+        for card in VCardGenerator.iter_vcards(contacts, version):
+            fileobj.write(card.encode('utf-8'))
+
+    @staticmethod
+    def write_contacts_v4(contacts, fileobj):
+        """以vCard 4.0格式写入"""
+        VCardGenerator.write_contacts(contacts, fileobj, version='4.0')
+
+    @staticmethod
+    def parse_file(path):
+        """
+        流式解析vCard文件
+
+        参数：
+            path: str, 文件路径
+
+        返回：
+            generator: 逐个产出联系人数据（line_number为BEGIN:VCARD所在行）
+        """
+        with open(path, encoding='utf-8-sig', errors='ignore', newline='') as f:
+            yield from VCardGenerator.parse_lines(f)
+
+    @staticmethod
+    def parse_lines(lines):
+        """
+        解析vCard文本行
+
+        参数：
+            lines: iterable of str, 文本行
+
+        返回：
+            generator: 逐个产出联系人数据
+        """
+        card = None
+        for line_number, line in VCardGenerator._unfold(lines):
+            if not line.strip():
+                continue
+
+            name, params, value = VCardGenerator._split_property(line)
+            if name == 'BEGIN' and value.upper() == 'VCARD':
+                card = {'line_number': line_number, 'properties': []}
+            elif name == 'END' and value.upper() == 'VCARD':
+                if card is not None:
+                    yield VCardGenerator._card_to_contact(card)
+                card = None
+            elif card is not None:
+                card['properties'].append((name, params, value))
+
+    @staticmethod
+    def _card_to_contact(card):
+        """把解析出的属性转换成联系人数据"""
+        contact = {
+            'line_number': card['line_number'],
+            'name': '',
+            'notes': '',
+            'is_favorite': False,
+            'tags': [],
+            'contact_methods': []
+        }
+        structured_name = ''
+
+        for name, params, value in card['properties']:
+            # vCard 2.1 也允许不带参数名的 QUOTED-PRINTABLE
+            encodings = [v.upper() for v in params.get('ENCODING', []) + params.get('TYPE', [])]
+            if 'QUOTED-PRINTABLE' in encodings:
+                charset = (params.get('CHARSET') or ['utf-8'])[0]
+                decoded = quopri.decodestring(value.encode('ascii', errors='ignore'))
+                try:
+                    value = decoded.decode(charset, errors='ignore')
+                except LookupError:
+                    # 未知的CHARSET按UTF-8处理，不让整个导入失败
+                    value = decoded.decode('utf-8', errors='ignore')
+
+            if name == 'FN':
+                contact['name'] = VCardGenerator._unescape(value).strip()
+            elif name == 'N':
+                parts = [VCardGenerator._unescape(part) for part in VCardGenerator._split_unescaped(value, ';')]
+                # N: 姓;名;中间名;前缀;后缀
+                structured_name = ''.join(parts[:2]).strip() if VCardGenerator._is_cjk(value) \
+                    else ' '.join(part for part in reversed(parts[:2]) if part).strip()
+            elif name == 'NOTE':
+                contact['notes'] = VCardGenerator._unescape(value)
+            elif name == 'CATEGORIES':
+                contact['tags'] = [VCardGenerator._unescape(tag).strip()
+                                   for tag in VCardGenerator._split_unescaped(value, ',')
+                                   if tag.strip()]
+            elif name == 'X-FAVORITE':
+                contact['is_favorite'] = value.strip().lower() in ('true', '1', 'yes')
+            elif name in PROPERTY_METHODS:
+                method_type = PROPERTY_METHODS[name]
+                if name == 'ADR':
+                    parts = [VCardGenerator._unescape(part).strip()
+                             for part in VCardGenerator._split_unescaped(value, ';')]
+                    value = ' '.join(part for part in parts if part)
+                elif name in ('X-SOCIALPROFILE', 'IMPP'):
+                    value = VCardGenerator._unescape(value)
+                elif value.lower().startswith(('tel:', 'mailto:')):
+                    value = value.split(':', 1)[1]
+
+                types = [t for t in params.get('TYPE', []) if t.upper() not in NON_LABEL_TYPES]
+                label = (params.get('X-LABEL') or types or [DEFAULT_LABEL])[0]
+                contact['contact_methods'].append({
+                    'type': method_type,
+                    'value': value.strip(),
+                    'label': label
+                })
+
+        if not contact['name']:
+            contact['name'] = structured_name
+        return contact
+
+    @staticmethod
+    def _unfold(lines):
+        """
+        合并折叠行，产出 (行号, 逻辑行)
+
+        以空格或制表符开头的行属于上一行；quoted-printable值以"="结尾时
+        （软换行，vCard 2.1常见）下一行也属于上一行
+        """
+        current = None
+        current_number = 0
+        for line_number, line in enumerate(lines, 1):
+            line = line.rstrip('\r\n')
+            if current is not None and current.endswith('=') and VCardGenerator._is_quoted_printable(current):
+                current = current[:-1] + line
+                continue
+            if line[:1] in (' ', '\t') and current is not None:
+                current += line[1:]
+                continue
+            if current is not None:
+                yield current_number, current
+            current, current_number = line, line_number
+        if current is not None:
+            yield current_number, current
+
+    @staticmethod
+    def _split_property(line):
+        """
+        拆分属性行为 (属性名, 参数, 值)
+
+        参数为 {参数名: [值]}，vCard 2.1 的无名参数（如 TEL;CELL）归入TYPE
+        """
+        # 值之前的冒号不会出现在引号外
+        in_quotes = False
+        colon = -1
+        for i, char in enumerate(line):
+            if char == '"':
+                in_quotes = not in_quotes
+            elif char == ':' and not in_quotes:
+                colon = i
+                break
+        if colon < 0:
+            return '', {}, ''
+
+        head, value = line[:colon], line[colon + 1:]
+        parts = VCardGenerator._split_quoted(head, ';')
+        name = parts[0].split('.')[-1].upper()  # 去掉 item1. 这样的分组前缀
+
+        params = {}
+        for part in parts[1:]:
+            key, sep, param_value = part.partition('=')
+            if not sep:
+                key, param_value = 'TYPE', part
+            key = key.upper()
+            if key in FREE_TEXT_PARAMS:
+                # 自由文本参数：引号内的逗号是值的一部分
+                values = [v.strip('"') for v in VCardGenerator._split_quoted(param_value, ',')]
+            else:
+                # 列表参数：TYPE="cell,voice" 与 TYPE=cell,voice 等价
+                values = [v.strip('"') for v in param_value.split(',')]
+            params.setdefault(key, []).extend(v for v in values if v)
+        return name, params, value
+
+    @staticmethod
+    def _split_quoted(text, separator):
+        """按引号外的分隔符拆分（保留引号）"""
+        parts = []
+        current = ''
+        in_quotes = False
+        for char in text:
+            if char == '"':
+                in_quotes = not in_quotes
+            if char == separator and not in_quotes:
+                parts.append(current)
+                current = ''
+            else:
+                current += char
+        parts.append(current)
+        return parts
+
+    @staticmethod
+    def _is_quoted_printable(line):
+        """属性参数中是否声明了quoted-printable编码"""
+        return 'QUOTED-PRINTABLE' in line.split(':', 1)[0].upper()
+
+    @staticmethod
+    def _split_unescaped(value, separator):
+        """按未转义的分隔符拆分（保留转义字符，之后再反转义）"""
+        parts = []
+        current = ''
+        escaped = False
+        for char in value:
+            if escaped:
+                current += '\\' + char
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == separator:
+                parts.append(current)
+                current = ''
+            else:
+                current += char
+        parts.append(current)
+        return parts
+
+    @staticmethod
+    def _escape(value):
+        return str(value or '').replace('\\', '\\\\').replace(',', '\\,') \
+            .replace(';', '\\;').replace('\r\n', '\\n').replace('\n', '\\n')
+
+    @staticmethod
+    def _unescape(value):
+        result = io.StringIO()
+        escaped = False
+        for char in value:
+            if escaped:
+                result.write('\n' if char in 'nN' else char)
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            else:
+                result.write(char)
+        return result.getvalue()
+
+    @staticmethod
+    def _param_value(value):
+        """参数值中含有特殊字符时加引号"""
+        value = str(value).replace('"', "'")
+        return f'"{value}"' if any(char in value for char in ':;,') else value
+
+    @staticmethod
+    def _fold(line):
+        """按RFC要求把超过75字节的行折叠，不拆开多字节字符"""
+        if len(line.encode('utf-8')) <= MAX_LINE_OCTETS:
+            return line
+
+        chunks = []
+        current = ''
+        current_size = 0
+        limit = MAX_LINE_OCTETS
+        for char in line:
+            size = len(char.encode('utf-8'))
+            if current_size + size > limit:
+                chunks.append(current)
+                current, current_size = '', 0
+                limit = MAX_LINE_OCTETS - 1  # 续行开头有一个空格
+            current += char
+            current_size += size
+        chunks.append(current)
+        return '\r\n '.join(chunks)
+
+    @staticmethod
+    def _is_cjk(value):
+        return any('\u4e00' <= char <= '\u9fff' for char in value)
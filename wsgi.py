@@ -0,0 +1,13 @@
+"""
+生产环境入口
+
+    flask --app wsgi init-db     # 部署时建表（只需执行一次）
+    gunicorn -w 4 wsgi:app       # 启动服务
+
+可通过环境变量 FLASK_CONFIG 选择配置（默认production）
+"""
+import os
+
+from app import create_app
+
+app = create_app(os.environ.get('FLASK_CONFIG', 'production'))